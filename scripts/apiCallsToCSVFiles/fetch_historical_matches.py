@@ -1,17 +1,12 @@
-import requests
 import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
 import os
 from scripts.db_pg import insert_fixtures
+from scripts.api_football_client import api_get, BASE_URL, HEADERS
 
 load_dotenv()
 
-
-API_KEY = os.getenv("API_FOOTBALL_KEY")
-BASE_URL = "https://v3.football.api-sports.io"
-HEADERS = {"x-apisports-key": API_KEY}
-
 LEAGUE_IDS = [39, 140, 78, 135, 61]  #Premier League, La Liga, Bundesliga, Serie A, Ligue 1
 
 OUTPUT_DIR = Path("data_api_football")
@@ -20,9 +15,8 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 
 def get_league_seasons(league_id):
     """Return available seasons for this league"""
-    url = f"{BASE_URL}/leagues"
     params = {"id": league_id}
-    resp = requests.get(url, headers=HEADERS, params=params, timeout=15)
+    resp = api_get("/leagues", params=params, timeout=15)
 
     if resp.status_code != 200:
         print(f"[ERROR] League {league_id} season call:", resp.text[:200])
@@ -45,10 +39,9 @@ def get_matches(league_code, league_id, seasons):
 
     for season in seasons:
         print(f"\nFetching matches for {league_code} season {season}...")
-        url = f"{BASE_URL}/fixtures"
         params = {"league": league_id, "season": season}
 
-        resp = requests.get(url, headers=HEADERS, params=params, timeout=20)
+        resp = api_get("/fixtures", params=params, timeout=20)
 
         if resp.status_code != 200:
             print(f"  [ERROR] {resp.status_code}: {resp.text[:200]}")
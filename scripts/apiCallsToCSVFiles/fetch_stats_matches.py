@@ -1,17 +1,11 @@
 import time
-import requests
 import pandas as pd
 from pathlib import Path
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from db_pg import get_db_connection, insert_match_stats
-
-from dotenv import load_dotenv
-load_dotenv()
-API_KEY = os.getenv("API_FOOTBALL_KEY")
-BASE_URL = "https://v3.football.api-sports.io"
-HEADERS = {"x-apisports-key": API_KEY}
+from db_pg import db_connection, insert_match_stats
+from api_football_client import api_get, BASE_URL, HEADERS
 
 INPUT_CSV = Path("data_api_football") / "All_matches_2018-2025.csv"
 OUTPUT_CSV = Path("data_api_football") / "All_matches_2018-2025_with_stats.csv"
@@ -36,12 +30,11 @@ def extract_stat(stats_list, stat_name):
     return None
 
 
-def fetch_fixture_stats(fixture_id, home_team_name, away_team_name):
+def fetch_fixture_stats(fixture_id, home_team_name, away_team_name, timeout=20):
     #Fetch stats for one fixture, return dict of home/away metrics.
-    url = f"{BASE_URL}/fixtures/statistics"
     params = {"fixture": fixture_id}
 
-    resp = requests.get(url, headers=HEADERS, params=params, timeout=20)
+    resp = api_get("/fixtures/statistics", params=params, timeout=timeout)
     if resp.status_code != 200:
         print(f"[{fixture_id}] stats error {resp.status_code}: {resp.text[:200]}")
         return {}
@@ -51,6 +44,11 @@ def fetch_fixture_stats(fixture_id, home_team_name, away_team_name):
         print(f"[{fixture_id}] no stats in response")
         return {}
 
+    return parse_fixture_stats(data, home_team_name, away_team_name)
+
+
+def parse_fixture_stats(data, home_team_name, away_team_name):
+    #Turn the /fixtures/statistics response list into a dict of home/away metrics.
     home_stats = {}
     away_stats = {}
 
@@ -114,15 +112,12 @@ def fetch_fixture_stats(fixture_id, home_team_name, away_team_name):
 
 def main():
     # Pull fixtures from DB
-    conn = get_db_connection() 
-    try:
+    with db_connection() as conn:
         df = pd.read_sql("""
             SELECT fixture_id, home_team, away_team
             FROM fixtures
             ORDER BY date DESC NULLS LAST
         """, conn)
-    finally:
-        conn.close()
 
     print("Loaded fixtures from DB:", len(df))
 
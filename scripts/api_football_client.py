@@ -0,0 +1,169 @@
+import os
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Single HTTP layer for every API-Football call (helpers, fetchers, producers).
+# One keep-alive session per process (connections reused across threads, gzip negotiated),
+# a process-wide token bucket matched to the API plan, retries with jittered backoff on
+# timeouts / 429 / 5xx, and per-endpoint latency + quota counters.
+API_KEY = os.getenv("API_FOOTBALL_KEY")
+BASE_URL = "https://v3.football.api-sports.io"
+HEADERS = {"x-apisports-key": API_KEY}
+
+API_POOL_MAXSIZE = int(os.getenv("API_POOL_MAXSIZE", "16"))  #keep-alive connections kept per host
+API_RATE_PER_MINUTE = float(os.getenv("API_RATE_PER_MINUTE", "300"))  #API plan limit (requests/minute)
+API_RATE_BURST = int(os.getenv("API_RATE_BURST", "10"))  #requests allowed back to back
+API_RETRIES = int(os.getenv("API_RETRIES", "3"))  #retries after the first attempt
+API_BACKOFF = float(os.getenv("API_BACKOFF", "0.5"))  #base seconds, doubled per retry (full jitter)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        # Blocks until a token is available, returns the seconds spent waiting
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+_bucket = TokenBucket(API_RATE_PER_MINUTE / 60.0, API_RATE_BURST)
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {}  # endpoint -> counters
+_quota = {}  # latest rate-limit headers returned by the API
+
+
+def get_session() -> requests.Session:
+    # Lazily created, recreated after fork (a forked child must not share the parent's sockets)
+    global _session, _session_pid
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            s = requests.Session()
+            s.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=API_POOL_MAXSIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session, _session_pid = s, os.getpid()
+    return _session
+
+
+def _record(endpoint: str, seconds: float, status, retries: int, throttled: float) -> None:
+    with _stats_lock:
+        st = _stats.setdefault(endpoint, {
+            "requests": 0, "errors": 0, "retries": 0,
+            "latency_total": 0.0, "latency_max": 0.0, "throttled_seconds": 0.0,
+        })
+        st["requests"] += 1
+        st["retries"] += retries
+        st["latency_total"] += seconds
+        st["latency_max"] = max(st["latency_max"], seconds)
+        st["throttled_seconds"] += throttled
+        if status is None or status >= 400:
+            st["errors"] += 1
+
+
+def _update_quota(resp: requests.Response) -> None:
+    h = resp.headers
+    quota = {
+        "day_limit": h.get("x-ratelimit-requests-limit"),
+        "day_remaining": h.get("x-ratelimit-requests-remaining"),
+        "minute_limit": h.get("X-RateLimit-Limit"),
+        "minute_remaining": h.get("X-RateLimit-Remaining"),
+    }
+    with _stats_lock:
+        _quota.update({k: int(v) for k, v in quota.items() if v is not None and str(v).isdigit()})
+
+
+def _backoff(attempt: int, retry_after: str | None = None) -> float:
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, API_BACKOFF * (2 ** attempt))
+
+
+def api_get(endpoint: str, params: dict | None = None, headers: dict | None = None, timeout: float = 20) -> requests.Response:
+    """
+    GET {BASE_URL}{endpoint} through the shared session, e.g. api_get("/fixtures", {"live": "all"}).
+    Timeouts, connection errors, 429 and 5xx are retried (API_RETRIES times); the last response
+    is returned as-is so callers keep their own status handling, a network error is re-raised.
+    """
+    url = f"{BASE_URL}{endpoint}"
+    session = get_session()
+    throttled = 0.0
+    t0 = time.perf_counter()
+    for attempt in range(API_RETRIES + 1):
+        throttled += _bucket.acquire()
+        try:
+            resp = session.get(url, headers=headers or HEADERS, params=params, timeout=timeout)
+        except (requests.Timeout, requests.ConnectionError):
+            if attempt == API_RETRIES:
+                _record(endpoint, time.perf_counter() - t0, None, attempt, throttled)
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+
+        _update_quota(resp)
+        if resp.status_code in RETRY_STATUS and attempt < API_RETRIES:
+            time.sleep(_backoff(attempt, resp.headers.get("Retry-After")))
+            continue
+        _record(endpoint, time.perf_counter() - t0, resp.status_code, attempt, throttled)
+        return resp
+
+
+def api_get_response(endpoint: str, params: dict | None = None, headers: dict | None = None, timeout: float = 20) -> list:
+    # The "response" list of a successful call, raises on HTTP errors
+    r = api_get(endpoint, params=params, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return r.json().get("response", []) or []
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        return {"endpoints": {k: dict(v) for k, v in _stats.items()}, "quota": dict(_quota)}
+
+
+def stats_line() -> str:
+    stats = get_stats()
+    parts = []
+    for endpoint, st in sorted(stats["endpoints"].items()):
+        avg_ms = st["latency_total"] / st["requests"] * 1000 if st["requests"] else 0.0
+        parts.append(
+            f"{endpoint} n={st['requests']} err={st['errors']} retries={st['retries']} "
+            f"avg={avg_ms:.0f}ms max={st['latency_max'] * 1000:.0f}ms"
+        )
+    quota = stats["quota"]
+    if quota:
+        parts.append(f"quota day={quota.get('day_remaining')}/{quota.get('day_limit')} "
+                     f"minute={quota.get('minute_remaining')}/{quota.get('minute_limit')}")
+    return "[API] " + (" | ".join(parts) if parts else "no requests yet")
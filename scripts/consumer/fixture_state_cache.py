@@ -0,0 +1,64 @@
+import os
+import time
+from collections import OrderedDict
+
+# Last persisted fixtures / match_stats row per fixture, kept by the predictor so a live event only
+# rewrites the tables whose columns actually changed (most events just move `elapsed`, which
+# none of these columns hold). Entries are LRU-bounded, dropped once a match is finished, and
+# expire after a TTL so changes made by other writers (refresh jobs, backfills) can't stay masked.
+FIXTURE_CACHE_MAX_ENTRIES = int(os.getenv("FIXTURE_CACHE_MAX_ENTRIES", "5000"))
+FIXTURE_CACHE_TTL = float(os.getenv("FIXTURE_CACHE_TTL", "600"))  #seconds before a row is rewritten anyway
+
+FINISHED_STATUSES = {"FT", "AET", "PEN", "CANC", "ABD", "AWD", "WO"}  #no more live events expected
+
+
+class FixtureStateCache:
+    def __init__(self, max_entries: int = FIXTURE_CACHE_MAX_ENTRIES, ttl: float = FIXTURE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._rows = OrderedDict()  # (table, fixture_id) -> (row values, monotonic time persisted)
+        self._tables = set()
+        self.written = 0
+        self.skipped = 0
+        self.evicted = 0
+
+    def changed(self, table: str, rows: list[dict], now: float | None = None) -> list[dict]:
+        """Rows (with a fixture_id) that differ from what was last persisted to `table`."""
+        now = time.monotonic() if now is None else now
+        out = []
+        for r in rows:
+            cached = self._rows.get((table, r["fixture_id"]))
+            if cached is not None and cached[0] == r and now - cached[1] < self.ttl:
+                self.skipped += 1
+            else:
+                out.append(r)
+        self.written += len(out)
+        return out
+
+    def mark_persisted(self, table: str, rows: list[dict], now: float | None = None) -> None:
+        # Only call once the upsert is committed, so a failed batch is written again on retry
+        now = time.monotonic() if now is None else now
+        self._tables.add(table)
+        for r in rows:
+            key = (table, r["fixture_id"])
+            self._rows[key] = (dict(r), now)
+            self._rows.move_to_end(key)
+        while len(self._rows) > self.max_entries:
+            self._rows.popitem(last=False)
+            self.evicted += 1
+
+    def forget_finished(self, fixture_rows: list[dict]) -> None:
+        for r in fixture_rows:
+            if r.get("status") in FINISHED_STATUSES:
+                for table in self._tables:
+                    self._rows.pop((table, r["fixture_id"]), None)
+
+    def clear(self) -> None:
+        # Partitions moved to another worker: its writes wouldn't be seen here
+        self._rows.clear()
+
+    def stats_line(self) -> str:
+        return (
+            f"[FIXTURE CACHE] entries={len(self._rows)} written={self.written} "
+            f"skipped={self.skipped} evicted={self.evicted}"
+        )
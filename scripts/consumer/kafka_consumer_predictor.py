@@ -1,26 +1,38 @@
 
-import os, sys
+import os, sys, time
+_BOOT_T0 = time.perf_counter()
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from model.real_time_predictor_model import predict_match_probs
+from model.real_time_predictor_model import predict_match_probs_batch, load_model, maybe_reload_model
 
-from confluent_kafka import Producer, Consumer
+import signal
+import argparse
+import threading
+import multiprocessing as mp
+from confluent_kafka import Consumer, KafkaException, TIMESTAMP_NOT_AVAILABLE
 import json
-from db_pg import insert_fixtures,insert_match_stats,insert_live_prediction
+from datetime import datetime, timezone
+from db_pg import insert_fixtures,insert_match_stats_batch,insert_live_predictions_batch,insert_live_predictions_history_batch
+from kafka_producer_factory import make_producer
+from event_codec import decode_event
+from kafka_consumer_offsets import CONSUMER_CONFIG, handle_batch
+from fixture_state_cache import FixtureStateCache
 
 
 BROKER = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
 TOPIC_LIVE = "match_stats_raw"
 TOPIC_REFRESH = "fixtures_refresh"
 TOPIC_OUTPUT = "match_predictions"
+TOPIC_DLQ = "match_events_dlq"  #messages that can't be processed (bad payload / rejected by the DB)
 
-consumer = Consumer({
-    "bootstrap.servers": BROKER,
-    "group.id": "kafka_consumer_predictor_group",
-    "auto.offset.reset": "earliest",
-})
+BATCH_SIZE = int(os.getenv("PREDICTOR_BATCH_SIZE", "500"))  #max messages handled per batch
+BATCH_TIMEOUT = float(os.getenv("PREDICTOR_BATCH_TIMEOUT", "1.0"))  #seconds to wait while filling a batch
+STARTUP_BUDGET_MS = float(os.getenv("PREDICTOR_STARTUP_BUDGET_MS", "500"))  #warn if boot takes longer than this
+GROUP_ID = os.getenv("PREDICTOR_GROUP_ID", "kafka_consumer_predictor_group")
+WORKERS = int(os.getenv("PREDICTOR_WORKERS", "1"))  #worker processes in the consumer group (supervisor mode if > 1)
+SHUTDOWN_TIMEOUT = 30  #seconds a worker gets to finish its batch and leave the group
+RESTART_BACKOFF = 5  #seconds before restarting a crashed worker
 
-consumer.subscribe([TOPIC_LIVE, TOPIC_REFRESH])
-producer = Producer({'bootstrap.servers': BROKER})
+state_cache = FixtureStateCache()  #per worker process: last persisted fixtures / match_stats rows
 
 def to_diff(e: dict) -> dict:
     def n(x): return 0 if x is None else x
@@ -52,96 +64,263 @@ def normalize_prob_keys(p: dict) -> dict:
         "prob_away_win": p.get("away_win"),
     }
 
-print("Kafka predictor consumer started. Waiting for messages...")
-
-while True:
-    msg = consumer.poll(1.0)
-    if msg is None:
-        continue
-    if msg.error():
-        print("Kafka error:", msg.error())
-        continue
-
-    e = json.loads(msg.value().decode("utf-8"))
-    mode = e.get("predict_mode") or e.get("mode") or "live"  #default to "live" mode
-
-    fixture_id = int(e.get("fixture_id")) if e.get("fixture_id") is not None else None
-    if fixture_id is None:
-        print("Skipping message without fixture_id:", e)
-        continue
-
-    #REFRESH MODE
-    if mode == "refresh":
-        fixture_row = {
-            "fixture_id": fixture_id,
-            "league": e.get("league"),
-            "season": int(e.get("season")) if e.get("season") is not None else None,
-            "date": e.get("date"),
-            "home_team": e.get("home_team"),
-            "away_team": e.get("away_team"),
-            "home_team_id": e.get("home_team_id"),
-            "away_team_id": e.get("away_team_id"),
-            "home_goals": e.get("home_goals"),
-            "away_goals": e.get("away_goals"),
-            "status": e.get("status_short"),
-        }
-        insert_fixtures([fixture_row])
-        print(f"REFRESH UPSERT OK fixture={fixture_id} status={fixture_row['status']}")
-        continue
-
-    #LIVE MODE (exhisting fixture stats update + prediction)
-    print(f"\nRECEIVED fixture_id={fixture_id}")
+STATS_KEYS = [
+    "home_shots_total", "home_shots_inbox", "home_possession", "home_pass_accuracy", "home_corners", "home_fouls",
+    "away_shots_total", "away_shots_inbox", "away_possession", "away_pass_accuracy", "away_corners", "away_fouls",
+]
+
+def fixture_row_from_event(e: dict, fixture_id: int, with_team_ids: bool) -> dict:
+    row = {
+        "fixture_id": fixture_id,
+        "league": e.get("league"),
+        "season": int(e.get("season")) if e.get("season") is not None else None,
+        "date": e.get("date"),
+        "home_team": e.get("home_team"),
+        "away_team": e.get("away_team"),
+        "home_goals": e.get("home_goals"),
+        "away_goals": e.get("away_goals"),
+        "status": e.get("status_short"),
+    }
+    if with_team_ids:
+        row["home_team_id"] = e.get("home_team_id")
+        row["away_team_id"] = e.get("away_team_id")
+    return row
+
+def event_time(msg) -> datetime:
+    # Kafka timestamp of the source event: stable across redeliveries, so history rows dedupe on it
+    ts_type, ts = msg.timestamp()
+    if ts_type == TIMESTAMP_NOT_AVAILABLE:
+        return datetime.now(timezone.utc)
+    return datetime.fromtimestamp(ts / 1000, timezone.utc)
+
+def process_batch(msgs, producer) -> None:
+    """
+    Handle one window of messages: one upsert per table, one model call, keyed async produce of the outputs.
+    Every live event is scored and appended to the history table; for the fixtures /
+    match_stats / predictions_live upserts events are collapsed per fixture (last message
+    wins), which leaves those tables in the same state as processing them one by one.
+    Fixture / stats rows identical to the last persisted ones are not rewritten.
+    """
+    fixture_rows = {}
+    history_events = []  # (fixture_id, event, event_time) for every live message, in order
+    live_events = {}  # fixture_id -> index of its last event in history_events
+    refreshed = 0
+
+    for msg in msgs:
+        if msg.error():
+            print("Kafka error:", msg.error())
+            continue
+
+        e = decode_event(msg.value())
+        mode = e.get("predict_mode") or e.get("mode") or "live"  #default to "live" mode
+
+        if e.get("fixture_id") is None:
+            raise ValueError(f"message without fixture_id: {e}")
+        fixture_id = int(e.get("fixture_id"))
+
+        #REFRESH MODE
+        if mode == "refresh":
+            fixture_rows[fixture_id] = fixture_row_from_event(e, fixture_id, with_team_ids=True)
+            refreshed += 1
+            continue
+
+        #LIVE MODE (exhisting fixture stats update + prediction)
+        fixture_rows[fixture_id] = fixture_row_from_event(e, fixture_id, with_team_ids=False)
+        live_events[fixture_id] = len(history_events)
+        history_events.append((fixture_id, e, event_time(msg)))
+
+    if not fixture_rows:
+        return
 
     try:
-        fixture_row = {
-            "fixture_id": fixture_id,
-            "league": e.get("league"),
-            "season": int(e.get("season")) if e.get("season") is not None else None,
-            "date": e.get("date"),
-            "home_team": e.get("home_team"),
-            "away_team": e.get("away_team"),
-            "home_goals": e.get("home_goals"),
-            "away_goals": e.get("away_goals"),
-            "status": e.get("status_short"),
-        }
-        insert_fixtures([fixture_row])
-
-        stats = {
-            "home_shots_total": e.get("home_shots_total"),
-            "home_shots_inbox": e.get("home_shots_inbox"),
-            "home_possession": e.get("home_possession"),
-            "home_pass_accuracy": e.get("home_pass_accuracy"),
-            "home_corners": e.get("home_corners"),
-            "home_fouls": e.get("home_fouls"),
-            "away_shots_total": e.get("away_shots_total"),
-            "away_shots_inbox": e.get("away_shots_inbox"),
-            "away_possession": e.get("away_possession"),
-            "away_pass_accuracy": e.get("away_pass_accuracy"),
-            "away_corners": e.get("away_corners"),
-            "away_fouls": e.get("away_fouls"),
-        }
-        insert_match_stats(fixture_id, stats)
-
-        diff = to_diff(e)
-        probs = normalize_prob_keys(predict_match_probs(diff))
-
-        meta = {
-            "league": e.get("league"),
-            "season": int(e.get("season")) if e.get("season") is not None else None,
-            "home_team": e.get("home_team"),
-            "away_team": e.get("away_team"),
-        }
-        insert_live_prediction(fixture_id, probs, meta)
-
-        producer.produce(TOPIC_OUTPUT, value=json.dumps({"fixture_id": fixture_id, **probs}).encode("utf-8"))
-        producer.flush()
-
-        print(f"DB WRITE OK for fixture {fixture_id}")
+        fixtures_changed = state_cache.changed("fixtures", list(fixture_rows.values()))
+        insert_fixtures(fixtures_changed)
+        state_cache.mark_persisted("fixtures", fixtures_changed)
+        stats_changed = []
+
+        if live_events:
+            fixture_ids = list(live_events.keys())
+            events = [history_events[live_events[fid]][1] for fid in fixture_ids]
+
+            stats_changed = state_cache.changed("match_stats", [
+                {"fixture_id": fid, **{k: e.get(k) for k in STATS_KEYS}}
+                for fid, e in zip(fixture_ids, events)
+            ])
+            insert_match_stats_batch(stats_changed)
+            state_cache.mark_persisted("match_stats", stats_changed)
+
+            # one model snapshot and one model call per batch (all events, the history needs
+            # every one of them), a hot reload only affects the next batch
+            snapshot = load_model()
+            history_probs = [
+                normalize_prob_keys(p)
+                for p in predict_match_probs_batch([to_diff(e) for _, e, _ in history_events], model=snapshot)
+            ]
+            probs_list = [history_probs[live_events[fid]] for fid in fixture_ids]
+
+            insert_live_predictions_batch([
+                {
+                    "fixture_id": fid,
+                    "league": e.get("league"),
+                    "season": int(e.get("season")) if e.get("season") is not None else None,
+                    "home_team": e.get("home_team"),
+                    "away_team": e.get("away_team"),
+                    **probs,
+                    "model_version": snapshot.version,
+                }
+                for fid, e, probs in zip(fixture_ids, events, probs_list)
+            ])
+
+            # append-only trajectory, the row above only keeps the latest probabilities
+            insert_live_predictions_history_batch([
+                {
+                    "fixture_id": fid,
+                    "event_time": ts,
+                    "elapsed": e.get("elapsed"),
+                    "status": e.get("status_short"),
+                    "home_goals": e.get("home_goals"),
+                    "away_goals": e.get("away_goals"),
+                    **probs,
+                    "model_version": snapshot.version,
+                }
+                for (fid, e, ts), probs in zip(history_events, history_probs)
+            ])
+
+            for fid, probs in zip(fixture_ids, probs_list):
+                out = {"fixture_id": fid, **probs, "model_version": snapshot.version}
+                producer.produce_event(TOPIC_OUTPUT, out)
+            producer.poll(0)
+
+        state_cache.forget_finished(list(fixture_rows.values()))
+        print(
+            f"BATCH OK messages={len(msgs)} fixtures={len(fixture_rows)} "
+            f"refresh={refreshed} live={len(live_events)} history={len(history_events)} "
+            f"fixtures_written={len(fixtures_changed)} stats_written={len(stats_changed)}"
+        )
 
     except Exception as ex:
         print("CONSUMER FAILED:", repr(ex))
         raise
 
+def make_consumer(worker_id: int) -> Consumer:
+    return Consumer({
+        "bootstrap.servers": BROKER,
+        "group.id": GROUP_ID,
+        "client.id": f"predictor-{worker_id}",
+        "auto.offset.reset": "earliest",
+        **CONSUMER_CONFIG,  #offsets committed by handle_batch after the DB writes
+        # only the partitions that actually move are revoked on a rebalance, the rest keep flowing
+        "partition.assignment.strategy": "cooperative-sticky",
+    })
+
+
+def install_stop_handlers() -> threading.Event:
+    # Signal handlers only flip a thread-local flag: setting a multiprocessing Event from a handler
+    # can deadlock with the same Event's wait() in the interrupted main thread
+    stop = threading.Event()
+    def handler(signum, frame):
+        print(f"[PREDICTOR] signal {signum} received, stopping after the current batch")
+        stop.set()
+    signal.signal(signal.SIGTERM, handler)
+    signal.signal(signal.SIGINT, handler)
+    return stop
+
+
+def run_worker(worker_id: int = 0, stop_event=None) -> None:
+    """
+    One consumer in the predictor group. A partition is owned by a single worker and its batches
+    are processed in order, so per-fixture ordering holds with any number of workers.
+    """
+    signalled = install_stop_handlers()
+    stopping = lambda: signalled.is_set() or (stop_event is not None and stop_event.is_set())
+    tag = f"[WORKER {worker_id}]"
+
+    producer = make_producer(f"predictor-{worker_id}", BROKER)
+    consumer = make_consumer(worker_id)
+
+    def on_assign(c, partitions):
+        print(tag, "assigned", [(p.topic, p.partition) for p in partitions])
+
+    def on_revoke(c, partitions):
+        # batches are processed synchronously, so every stored offset is already in the DB:
+        # deliver the outputs and commit before another worker takes these partitions over
+        print(tag, "revoked", [(p.topic, p.partition) for p in partitions])
+        print(state_cache.stats_line())
+        state_cache.clear()  #the next owner of these fixtures writes without us seeing it
+        producer.flush(10)
+        try:
+            c.commit(asynchronous=False)
+        except KafkaException as ex:
+            print(tag, "commit on revoke skipped:", ex)
+
+    consumer.subscribe([TOPIC_LIVE, TOPIC_REFRESH], on_assign=on_assign, on_revoke=on_revoke)
+
+    # model artifacts are loaded lazily on the first batch (see real_time_predictor_model.load_model)
+    startup_ms = (time.perf_counter() - _BOOT_T0) * 1000
+    budget_note = "OK" if startup_ms <= STARTUP_BUDGET_MS else "OVER BUDGET"
+    print(f"{tag} Startup took {startup_ms:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms, {budget_note})")
+    print(f"{tag} Kafka predictor consumer started. Waiting for messages...")
+
+    try:
+        while not stopping():
+            maybe_reload_model()
+            msgs = consumer.consume(num_messages=BATCH_SIZE, timeout=BATCH_TIMEOUT)
+            if not msgs:
+                continue
+            handle_batch(consumer, producer, msgs, lambda batch: process_batch(batch, producer), TOPIC_DLQ)
+    finally:
+        try:
+            consumer.commit(asynchronous=False)  #offsets of the batches that made it to the DB
+        except KafkaException as ex:
+            print(tag, "final commit skipped:", ex)
+        consumer.close()  #leaves the group, so partitions move right away
+        producer.flush(SHUTDOWN_TIMEOUT)
+        print(tag, "stopped")
+
+
+def supervise(n_workers: int) -> None:
+    """Run n_workers worker processes in the same consumer group, restart crashed ones, stop them together."""
+    ctx = mp.get_context("spawn")  #fresh interpreters: librdkafka threads don't survive fork
+    stop_event = ctx.Event()  #shared with the workers
+    signalled = install_stop_handlers()
+
+    def start(worker_id):
+        proc = ctx.Process(target=run_worker, args=(worker_id, stop_event), name=f"predictor-{worker_id}")
+        proc.start()
+        print(f"[SUPERVISOR] started worker {worker_id} pid={proc.pid}")
+        return proc
+
+    workers = {i: start(i) for i in range(n_workers)}
+    while not signalled.is_set():
+        for worker_id, proc in list(workers.items()):
+            if not proc.is_alive() and not signalled.is_set():
+                print(f"[SUPERVISOR] worker {worker_id} exited with code {proc.exitcode}, restarting in {RESTART_BACKOFF}s")
+                if signalled.wait(RESTART_BACKOFF):
+                    break
+                workers[worker_id] = start(worker_id)
+        signalled.wait(1.0)
+
+    # coordinated shutdown: every worker finishes its batch, commits and leaves the group
+    stop_event.set()
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    for worker_id, proc in workers.items():
+        proc.join(max(0.0, deadline - time.monotonic()))
+        if proc.is_alive():
+            print(f"[SUPERVISOR] worker {worker_id} did not stop in time, terminating")
+            proc.terminate()
+            proc.join(5)
+    print("[SUPERVISOR] all workers stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live predictor consumer")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker processes in the consumer group")
+    args = parser.parse_args()
+    if args.workers > 1:
+        supervise(args.workers)
+    else:
+        run_worker(0)
+
 
 
             # test = diff.copy()
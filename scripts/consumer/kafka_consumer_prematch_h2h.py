@@ -2,19 +2,28 @@ import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import json
 import time
+import argparse
 from confluent_kafka import Consumer
 
-from db_pg import insert_prematch_h2h
-from api_football_live_helper import get_head_to_head
+from db_pg import insert_prematch_h2h, fetch_h2h_from_fixtures
+from h2h_cache import get_head_to_head_cached, stats_line
+from kafka_producer_factory import make_producer
+from kafka_consumer_offsets import CONSUMER_CONFIG, handle_batch
 
 BROKER = "localhost:9092"
 TOPIC = "prematch_h2h"
+TOPIC_DLQ = "prematch_h2h_dlq"
 API_KEY = os.getenv("API_FOOTBALL_KEY")
 HEADERS = {
     "x-apisports-key": API_KEY
 }
 LAST_H2H = 10  #number of last h2h matches to fetch
 SLEEP_BETWEEN_API_CALLS = 0.05  #seconds between API calls to avoid rate limits
+H2H_MIN_LOCAL_MATCHES = int(os.getenv("H2H_MIN_LOCAL_MATCHES", "5"))  #fewer local meetings than this -> ask the API
+BATCH_SIZE = 500  #max messages handled per batch
+BATCH_TIMEOUT = 1.0  #seconds to wait while filling a batch
+LOCAL_BATCH_LIMIT = 5000  #max pending fixtures per --local-batch run
+STALE_HOURS = 12
 
 def build_h2h_features(fixtures: list[dict], fixture_id: int, home_team_id: int, away_team_id: int) -> dict:
     home_wins = 0
@@ -84,70 +93,111 @@ def build_h2h_features(fixtures: list[dict], fixture_id: int, home_team_id: int,
     }
 
  
-def main():
-    consumer = Consumer({
-        'bootstrap.servers': BROKER,
-        'group.id': 'prematch_h2h_consumer_group',
-        'auto.offset.reset': 'earliest'
-    })
-    consumer.subscribe([TOPIC])
-    print(f"[PREMATCH H2H CONSUMER] listening topic={TOPIC} broker={BROKER}")
+def h2h_from_api(fixture_id: int, home_team_id: int, away_team_id: int) -> dict:
+    fixtures, from_cache = get_head_to_head_cached(
+        HEADERS,
+        home_team_id,
+        away_team_id,
+        last=LAST_H2H,
+        timeout=25
+    )
+    print(f"[DEBUG] fixture_id={fixture_id} api_returned={len(fixtures)} cached={from_cache}")
+    row = build_h2h_features(fixtures, fixture_id, home_team_id, away_team_id)
+
+    if SLEEP_BETWEEN_API_CALLS and not from_cache:
+        time.sleep(SLEEP_BETWEEN_API_CALLS)
+    return row
+
+
+def process_pending(pending: dict[int, tuple[int, int]], local_rows: list[dict] | None = None) -> int:
+    """
+    pending: fixture_id -> (home_team_id, away_team_id).
+    H2H is aggregated locally from the fixtures table in one query; only fixtures with fewer
+    than H2H_MIN_LOCAL_MATCHES local meetings fall back to the API.
+    """
+    if local_rows is None:
+        local_rows = fetch_h2h_from_fixtures(list(pending.keys()), last=LAST_H2H)
+    local_by_id = {r["fixture_id"]: r for r in local_rows}
+
+    rows = []
+    api_needed = []
+    for fixture_id, (home_team_id, away_team_id) in pending.items():
+        local = local_by_id.get(fixture_id)
+        if local is not None and local["h2h_matches"] >= H2H_MIN_LOCAL_MATCHES:
+            rows.append(local)
+        else:
+            api_needed.append((fixture_id, home_team_id, away_team_id))
 
-    while True:
-        msg = consumer.poll(1.0)
-        if msg is None:
-            continue
+    for fixture_id, home_team_id, away_team_id in api_needed:
+        try:
+            rows.append(h2h_from_api(fixture_id, home_team_id, away_team_id))
+        except Exception as ex:
+            print(f"[FAILED] fixture_id={fixture_id} err={repr(ex)}")
+
+    inserted = insert_prematch_h2h(rows)
+    print(f"[H2H] fixtures={len(pending)} local={len(pending) - len(api_needed)} api={len(api_needed)} upserted={inserted}")
+    if api_needed:
+        print(stats_line())
+    return inserted
+
+
+def run_local_batch():
+    # One-shot: every fixture needing an H2H refresh, without going through Kafka
+    local_rows = fetch_h2h_from_fixtures(last=LAST_H2H, limit=LOCAL_BATCH_LIMIT, stale_hours=STALE_HOURS)
+    pending = {r["fixture_id"]: (r["home_team_id"], r["away_team_id"]) for r in local_rows}
+    process_pending(pending, local_rows)
+
+
+def parse_pending(msgs) -> dict[int, tuple[int, int]]:
+    # Raises on a bad message so handle_batch can isolate it and send it to the DLQ
+    pending = {}
+    for msg in msgs:
         if msg.error():
             print("Kafka error:", msg.error())
             continue
-        
+
         e = json.loads(msg.value().decode("utf-8"))
         fixture_id = e.get("fixture_id")
         home_team_id = e.get("home_team_id")
         away_team_id = e.get("away_team_id")
-        league = e.get("league")
-        season = e.get("season")
 
         if fixture_id is None or home_team_id is None or away_team_id is None:
-            print("Skipping message with missing ids", e)
-            continue
-        
-        fixture_id = int(fixture_id)
-        home_team_id = int(home_team_id)
-        away_team_id = int(away_team_id)
+            raise ValueError(f"message with missing ids: {e}")
 
-        try:
-            fixtures = get_head_to_head(
-                HEADERS,
-                home_team_id,
-                away_team_id,
-                last=LAST_H2H,
-                timeout=25
-            )
-            print(f"[DEBUG] fixture_id={fixture_id} api_returned={len(fixtures)} league={league} season={season}")
-            row = build_h2h_features(fixtures, fixture_id, home_team_id, away_team_id)
-            inserted = insert_prematch_h2h([row])
-
-            print(
-                f"fixture_id={fixture_id} "
-                f"used={row['h2h_matches']} W/D/L={row['h2h_home_wins']}/{row['h2h_draws']}/{row['h2h_away_wins']} "
-                f"GF={row['h2h_home_goals_for']:.2f} GA={row['h2h_home_goals_against']:.2f} GD={row['h2h_home_goal_diff']:.2f}"
-            )
-
-            if SLEEP_BETWEEN_API_CALLS:
-                time.sleep(SLEEP_BETWEEN_API_CALLS)
-
-        except Exception as ex:
-            print(f"[FAILED] fixture_id={fixture_id} err={repr(ex)}")
-
-
-if __name__ == "__main__":
-    main()
+        pending[int(fixture_id)] = (int(home_team_id), int(away_team_id))
+    return pending
 
 
+def process_messages(msgs) -> None:
+    pending = parse_pending(msgs)
+    if pending:
+        process_pending(pending)
 
 
+def main():
+    consumer = Consumer({
+        'bootstrap.servers': BROKER,
+        'group.id': 'prematch_h2h_consumer_group',
+        'auto.offset.reset': 'earliest',
+        **CONSUMER_CONFIG,  #offsets committed by handle_batch after the upsert
+    })
+    producer = make_producer("prematch-h2h-consumer", BROKER)  #dead letters only
+    consumer.subscribe([TOPIC])
+    print(f"[PREMATCH H2H CONSUMER] listening topic={TOPIC} broker={BROKER}")
 
-   
+    while True:
+        msgs = consumer.consume(num_messages=BATCH_SIZE, timeout=BATCH_TIMEOUT)
+        if not msgs:
+            continue
+        handle_batch(consumer, producer, msgs, process_messages, TOPIC_DLQ)
 
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prematch head-to-head features")
+    parser.add_argument("--local-batch", action="store_true",
+                        help="aggregate H2H for all pending fixtures from the fixtures table once and exit")
+    args = parser.parse_args()
+    if args.local_batch:
+        run_local_batch()
+    else:
+        main()
@@ -0,0 +1,207 @@
+import os, sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.features_build import (
+    DATA_DIR,
+    INPUT_CSV,
+    OUTPUT_CSV,
+    ROLLING_WINDOW,
+    MIN_MATCHES,
+    STAT_COLS,
+    DIFF_COLS,
+    KEEP_COLS,
+    build_features,
+    build_team_frame,
+)
+from data.storage import read_table, write_table, append_table
+
+# Incremental version of features_build: keeps the last ROLLING_WINDOW stat rows of every
+# (league, season, team) and turns newly finished fixtures into feature rows in O(new matches).
+#   python data/feature_store.py bootstrap   # full build once, from INPUT_CSV
+#   python data/feature_store.py update      # append newly finished fixtures from Postgres
+STATE_PATH = DATA_DIR / "feature_store_state.json"
+
+SIDE_STATS = {
+    side: [f"{side}_goals"] + [f"{side}_{c}" for c in STAT_COLS[1:]]
+    for side in ("home", "away")
+}  # raw fixture columns in STAT_COLS order, per side
+
+
+def _team_key(league, season, team) -> str:
+    return f"{league}|{int(season)}|{team}"
+
+
+def _to_float(v):
+    return None if v is None or pd.isna(v) else float(v)
+
+
+class FeatureStore:
+    def __init__(self, teams: dict | None = None, watermark: list | None = None):
+        # team key -> {"last_date": iso str, "fixture_ids": [...], "rows": [[STAT_COLS values], ...]}
+        self.teams = teams or {}
+        if isinstance(watermark, str):  #older state files kept only the timestamp
+            watermark = [watermark, 0]
+        self.watermark = watermark  # [changed_at iso str, fixture_id] of the last row pulled from the DB
+
+    @classmethod
+    def load(cls, path: Path = STATE_PATH) -> "FeatureStore":
+        with open(path) as f:
+            state = json.load(f)
+        if state.get("window") != ROLLING_WINDOW:
+            raise ValueError(f"{path} was built with window={state.get('window')}, expected {ROLLING_WINDOW}; re-run bootstrap")
+        return cls(state["teams"], state.get("watermark"))
+
+    def save(self, path: Path = STATE_PATH) -> None:
+        state = {"window": ROLLING_WINDOW, "watermark": self.watermark, "teams": self.teams}
+        tmp = Path(str(path) + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "FeatureStore":
+        """Seed the rolling state from a full history of fixtures with stats (finished matches only)."""
+        df = df[df["home_goals"].notna() & df["away_goals"].notna()].copy()
+        df["season"] = df["season"].astype(int)
+        df["date"] = pd.to_datetime(df["date"], utc=True)
+
+        team_df = build_team_frame(df)
+        tail = team_df.groupby(["league", "season", "team"], sort=False).tail(ROLLING_WINDOW)
+
+        teams = {}
+        for (league, season, team), g in tail.groupby(["league", "season", "team"], sort=False):
+            teams[_team_key(league, season, team)] = {
+                "last_date": g["date"].iloc[-1].isoformat(),
+                "fixture_ids": [int(x) for x in g["fixture_id"]],
+                "rows": [[_to_float(v) for v in row] for row in g[STAT_COLS].itertuples(index=False)],
+            }
+        return cls(teams)
+
+    def _team_avg(self, key: str) -> np.ndarray:
+        # Same rule as rolling(window, min_periods).mean(): mean of non-missing values in the window
+        state = self.teams.get(key)
+        if not state or not state["rows"]:
+            return np.full(len(STAT_COLS), np.nan)
+        rows = np.array(state["rows"], dtype=float)
+        counts = (~np.isnan(rows)).sum(axis=0)
+        sums = np.nansum(rows, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts >= MIN_MATCHES, sums / counts, np.nan)
+
+    def _push(self, key: str, fixture_id: int, date: pd.Timestamp, values: list) -> None:
+        state = self.teams.setdefault(key, {"last_date": None, "fixture_ids": [], "rows": []})
+        state["fixture_ids"] = (state["fixture_ids"] + [fixture_id])[-ROLLING_WINDOW:]
+        state["rows"] = (state["rows"] + [values])[-ROLLING_WINDOW:]
+        state["last_date"] = date.isoformat()
+
+    def add_matches(self, matches: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply newly finished fixtures (raw columns as in INPUT_CSV) in date order and return their
+        feature rows (KEEP_COLS, rows without enough history dropped like features_build does).
+        Fixtures already in a team's window are skipped, so re-pulling the same rows is harmless.
+        Fixtures older than a team's last applied match cannot be inserted incrementally and are
+        reported as stale (run bootstrap to include them).
+        """
+        if matches.empty:
+            return pd.DataFrame(columns=KEEP_COLS)
+
+        matches = matches[matches["home_goals"].notna() & matches["away_goals"].notna()].copy()
+        matches["season"] = matches["season"].astype(int)
+        matches["date"] = pd.to_datetime(matches["date"], utc=True)
+        matches = matches.sort_values(["date", "fixture_id"], kind="stable")
+
+        out = []
+        applied = skipped = stale = 0
+        for m in matches.to_dict("records"):
+            fixture_id = int(m["fixture_id"])
+            home_key = _team_key(m["league"], m["season"], m["home_team"])
+            away_key = _team_key(m["league"], m["season"], m["away_team"])
+            home_state = self.teams.get(home_key, {})
+            away_state = self.teams.get(away_key, {})
+
+            if fixture_id in home_state.get("fixture_ids", ()) or fixture_id in away_state.get("fixture_ids", ()):
+                skipped += 1
+                continue
+            last_dates = [s["last_date"] for s in (home_state, away_state) if s.get("last_date")]
+            if any(m["date"] < pd.Timestamp(d) for d in last_dates):
+                stale += 1
+                continue
+
+            diffs = self._team_avg(home_key) - self._team_avg(away_key)
+            h, a = float(m["home_goals"]), float(m["away_goals"])
+            if not np.isnan(diffs).any():
+                out.append({
+                    "league": m["league"],
+                    "season": m["season"],
+                    "date": m["date"],
+                    "fixture_id": fixture_id,
+                    "home_team": m["home_team"],
+                    "away_team": m["away_team"],
+                    "home_goals": h,
+                    "away_goals": a,
+                    "label": 2.0 if h > a else (1.0 if h == a else 0.0),
+                    **dict(zip(DIFF_COLS, diffs.tolist())),
+                })
+
+            self._push(home_key, fixture_id, m["date"], [_to_float(m.get(c)) for c in SIDE_STATS["home"]])
+            self._push(away_key, fixture_id, m["date"], [_to_float(m.get(c)) for c in SIDE_STATS["away"]])
+            applied += 1
+
+        print(f"[FEATURE STORE] applied={applied} new_rows={len(out)} already_applied={skipped} stale={stale}")
+        return pd.DataFrame(out, columns=KEEP_COLS)
+
+
+def bootstrap():
+    print("Loading:", INPUT_CSV)
+    df = read_table(INPUT_CSV)
+
+    features = build_features(df)
+    saved_to = write_table(features, OUTPUT_CSV)
+    print(f"Saved {len(features)} feature rows to: {saved_to}")
+
+    store = FeatureStore.from_history(df)
+    store.save()
+    print(f"Saved rolling state for {len(store.teams)} teams to: {STATE_PATH}")
+
+
+def update(limit: int = 50000):
+    from db_pg import fetch_finished_matches_with_stats
+
+    if not STATE_PATH.exists():
+        raise SystemExit(f"{STATE_PATH} not found, run: python data/feature_store.py bootstrap")
+
+    store = FeatureStore.load()
+    rows = fetch_finished_matches_with_stats(since=tuple(store.watermark) if store.watermark else None, limit=limit)
+    print(f"Fetched {len(rows)} finished fixtures changed since {store.watermark}")
+    if not rows:
+        return
+
+    matches = pd.DataFrame(rows)
+    new_features = store.add_matches(matches)
+    saved_to = append_table(new_features, OUTPUT_CSV)
+
+    last = rows[-1]  # rows come ordered by (changed_at, fixture_id)
+    store.watermark = [last["changed_at"].isoformat(), int(last["fixture_id"])]
+    store.save()
+    print(f"Appended {len(new_features)} rows to: {saved_to}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental rolling-feature store")
+    parser.add_argument("command", choices=["bootstrap", "update"])
+    parser.add_argument("--limit", type=int, default=50000, help="max fixtures pulled per update")
+    args = parser.parse_args()
+
+    if args.command == "bootstrap":
+        bootstrap()
+    else:
+        update(args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
+import numpy as np
 import pandas as pd
+from pandas.api.indexers import BaseIndexer
 from pathlib import Path
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.storage import read_table, write_table
 
 DATA_DIR = Path("data_api_football")
 INPUT_CSV = DATA_DIR / "All_matches_2018-2025_with_stats.csv"
@@ -8,15 +14,94 @@ OUTPUT_CSV = DATA_DIR / "All_matches_features.csv"
 ROLLING_WINDOW = 10
 MIN_MATCHES = 5  # minimum previous matches for rolling to be valid
 
+# Per-team stats averaged over the rolling window
+STAT_COLS = [
+    "goals_for",
+    "shots_total",
+    "shots_inbox",
+    "possession",
+    "pass_accuracy",
+    "corners",
+    "fouls",
+]
+
+DIFF_COLS = [
+    "diff_goals",
+    "diff_shots",
+    "diff_shots_inbox",
+    "diff_possession",
+    "diff_pass_accuracy",
+    "diff_corners",
+    "diff_fouls",
+]
+
+# Columns written to OUTPUT_CSV
+KEEP_COLS = [
+    "league",
+    "season",
+    "date",
+    "fixture_id",
+    "home_team",
+    "away_team",
+    "home_goals",
+    "away_goals",
+    "label",
+] + DIFF_COLS
+
+
+class TeamBlockIndexer(BaseIndexer):
+    """Trailing window of `window_size` rows that never reaches back past the start of its block."""
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = np.maximum(self.block_start, end - self.window_size)
+        return start, end
+
+
+def rolling_team_averages(team_df: pd.DataFrame, group_cols: list, stat_cols: list) -> pd.DataFrame:
+    """
+    Rolling mean of the previous ROLLING_WINDOW matches (at least MIN_MATCHES) for every row,
+    computed within each group. team_df must already be sorted by group_cols + date so that
+    every group is one contiguous block. Returns a frame aligned on team_df's index.
+    """
+    # first row of every contiguous (league, season, team) block and the block start of every row
+    keys = team_df[group_cols]
+    first_in_block = keys.ne(keys.shift()).any(axis=1).to_numpy()
+    positions = np.arange(len(team_df), dtype=np.int64)
+    block_start = np.maximum.accumulate(np.where(first_in_block, positions, 0))
+
+    # one pass of the rolling kernel over all blocks (same kernel/bounds as groupby().rolling())
+    indexer = TeamBlockIndexer(window_size=ROLLING_WINDOW, block_start=block_start)
+    values = (
+        team_df[stat_cols]
+        .rolling(window=indexer, min_periods=MIN_MATCHES)
+        .mean()
+        .to_numpy()
+    )
 
-def main():
-    print("Loading:", INPUT_CSV)
-    df = pd.read_csv(INPUT_CSV)
+    # shift(1) inside each block: move every row down and blank the first row of each block
+    shifted = np.empty_like(values)
+    shifted[1:] = values[:-1]
+    shifted[first_in_block] = np.nan
 
-    # Basic cleaning / typing
-    df["season"] = df["season"].astype(int)
-    df["date"] = pd.to_datetime(df["date"])
+    return pd.DataFrame(shifted, index=team_df.index, columns=stat_cols)
 
+
+def label_results(home_goals: pd.Series, away_goals: pd.Series) -> pd.Series:
+    # 2 = home win, 1 = draw, 0 = away win, NaN when either score is missing
+    label = np.select(
+        [home_goals > away_goals, home_goals == away_goals, home_goals < away_goals],
+        [2.0, 1.0, 0.0],
+        default=np.nan,
+    )
+    # keep integer labels when every score is known (same CSV output as the old row-wise apply)
+    if not np.isnan(label).any():
+        label = label.astype(np.int64)
+    return pd.Series(label, index=home_goals.index)
+
+
+def build_team_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Team-perspective rows (home and away side of every fixture) sorted by league, season, team, date."""
     # Stats from home side perspective
     home_cols = {
         "home_team": "team",
@@ -57,29 +142,23 @@ def main():
 
     team_df = pd.concat([home_df, away_df], ignore_index=True)
 
-    # Compute rolling averages over previous 10 games per team
-    stat_cols = [
-        "goals_for",
-        "shots_total",
-        "shots_inbox",
-        "possession",
-        "pass_accuracy",
-        "corners",
-        "fouls",
-    ]
-
-    team_df = team_df.sort_values(["league", "season", "team", "date"])
-
-    # groupby + rolling + shift(1) to use ONLY previous matches
-    rolling_avgs = (
-        team_df.groupby(["league", "season", "team"])[stat_cols]
-        .apply(
-            lambda g: g.rolling(window=ROLLING_WINDOW, min_periods=MIN_MATCHES)
-            .mean()
-            .shift(1)
-        )
-        .reset_index(level=[0, 1, 2], drop=True)
-    )
+    return team_df.sort_values(["league", "season", "team", "date"])
+
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Match-level training rows (label + home-away rolling diffs) from raw fixtures with stats."""
+    df = df.copy()
+
+    # Basic cleaning / typing
+    df["season"] = df["season"].astype(int)
+    df["date"] = pd.to_datetime(df["date"])
+
+    # One row per (fixture, side), sorted into contiguous team blocks
+    team_df = build_team_frame(df)
+    stat_cols = STAT_COLS
+
+    # rolling over previous matches only (shift(1)), vectorized per team block
+    rolling_avgs = rolling_team_averages(team_df, ["league", "season", "team"], stat_cols)
 
     for col in stat_cols:
         team_df[f"avg_{col}"] = rolling_avgs[col]
@@ -126,31 +205,11 @@ def main():
     features["diff_corners"] = features["home_avg_corners"] - features["away_avg_corners"]
     features["diff_fouls"] = features["home_avg_fouls"] - features["away_avg_fouls"]
 
-    # Create label: 2 = home win, 1 = draw, 0 = away win 
-    def label_result(row):
-        h = row["home_goals"]
-        a = row["away_goals"]
-        if pd.isna(h) or pd.isna(a):
-            return None
-        if h > a:
-            return 2
-        elif h == a:
-            return 1
-        else:
-            return 0
-
-    features["label"] = features.apply(label_result, axis=1)
+    # Create label: 2 = home win, 1 = draw, 0 = away win (NaN if not played yet)
+    features["label"] = label_results(features["home_goals"], features["away_goals"])
 
     #  Drop rows with insufficient history / missing label 
-    diff_cols = [
-        "diff_goals",
-        "diff_shots",
-        "diff_shots_inbox",
-        "diff_possession",
-        "diff_pass_accuracy",
-        "diff_corners",
-        "diff_fouls",
-    ]
+    diff_cols = DIFF_COLS
 
     before = len(features)
     features = features.dropna(subset=diff_cols + ["label"])
@@ -158,23 +217,22 @@ def main():
     print(f"Dropped {before - after} rows due to insufficient history / missing label.")
 
     #  Keep only what needed for training
-    keep_cols = [
-        "league",
-        "season",
-        "date",
-        "fixture_id",
-        "home_team",
-        "away_team",
-        "home_goals",
-        "away_goals",
-        "label",
-    ] + diff_cols
+    keep_cols = KEEP_COLS
 
     features = features[keep_cols].sort_values(["season", "league", "date"])
 
+    return features
+
+
+def main():
+    print("Loading:", INPUT_CSV)
+    df = read_table(INPUT_CSV)
+
+    features = build_features(df)
+
     print("Final training rows:", len(features))
-    print("Saving to:", OUTPUT_CSV)
-    features.to_csv(OUTPUT_CSV, index=False)
+    saved_to = write_table(features, OUTPUT_CSV)
+    print("Saved to:", saved_to)
     print("Done.")
 
 
@@ -0,0 +1,171 @@
+import os
+import time
+import shutil
+import argparse
+from datetime import datetime, timezone
+import pandas as pd
+from pathlib import Path
+
+# Columnar storage for the data_api_football datasets.
+# Every table keeps its historical CSV path as its name (e.g. data_api_football/All_matches_features.csv);
+# in parquet mode it lives next to it as a directory dataset (All_matches_features.parquet/part-*.parquet)
+# with compact dtypes, so stages can read only the columns / leagues / seasons they need and
+# incremental jobs can append a new part file instead of rewriting the table.
+# CSV stays the default (the committed datasets are CSV); opt in with STORAGE_FORMAT=parquet after converting.
+#   python data/storage.py convert   # CSV -> Parquet for every CSV in data_api_football, with a size/load report
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+STORAGE_FORMAT = os.getenv("STORAGE_FORMAT", "csv")  # "csv" | "parquet", used by reads and writes alike
+DATA_DIR = Path(__file__).resolve().parent.parent / "data_api_football"
+ROW_GROUP_SIZE = 50_000  # datasets are written grouped by league/season, so row-group stats let filters skip groups
+
+STAT_NAMES = ["shots_total", "shots_inbox", "possession", "pass_accuracy", "corners", "fouls"]
+
+# Explicit dtypes for every known column, anything else is left as pandas infers it.
+# Raw stats/goals are small integers or whole percentages, so float32 holds them exactly;
+# derived features and probabilities stay float64.
+SCHEMA = {
+    "league": "category",
+    "home_team": "category",
+    "away_team": "category",
+    "season": "int16",
+    "fixture_id": "int32",
+    "home_team_id": "Int32",
+    "away_team_id": "Int32",
+    "home_goals": "float32",
+    "away_goals": "float32",
+    "label": "float32",
+    **{f"{side}_{stat}": "float32" for side in ("home", "away") for stat in STAT_NAMES},
+}
+
+
+def parquet_path(path) -> Path:
+    return Path(path).with_suffix(".parquet")
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for col, dtype in SCHEMA.items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            df[col] = df[col].astype(dtype)
+    if "date" in df.columns and not isinstance(df["date"].dtype, pd.DatetimeTZDtype):
+        df["date"] = pd.to_datetime(df["date"], utc=True)
+    return df
+
+
+def _filters(leagues, seasons):
+    filters = []
+    if leagues is not None:
+        filters.append(("league", "in", list(leagues)))
+    if seasons is not None:
+        filters.append(("season", "in", [int(s) for s in seasons]))
+    return filters or None
+
+
+def read_table(path, columns: list | None = None, leagues: list | None = None, seasons: list | None = None,
+               storage_format: str | None = None) -> pd.DataFrame:
+    """
+    Load a dataset by its CSV path (row order is preserved), in the same format write_table uses.
+    Parquet mode reads only `columns` and pushes the league/season filters down to the row groups
+    (falling back to the CSV until the table has been converted); CSV mode parses the CSV and
+    applies the same dtypes and filters.
+    """
+    storage_format = storage_format or STORAGE_FORMAT
+    pq = parquet_path(path)
+    if storage_format == "parquet":
+        if not HAS_PYARROW:
+            raise RuntimeError("STORAGE_FORMAT=parquet needs pyarrow (pip install pyarrow)")
+        if pq.exists():
+            return pd.read_parquet(pq, columns=columns, filters=_filters(leagues, seasons))
+
+    usecols = None
+    if columns is not None:
+        usecols = list(dict.fromkeys(list(columns) + [c for c, v in (("league", leagues), ("season", seasons)) if v is not None]))
+    df = apply_schema(pd.read_csv(path, usecols=usecols))
+    if leagues is not None:
+        df = df[df["league"].isin(list(leagues))]
+    if seasons is not None:
+        df = df[df["season"].isin([int(s) for s in seasons])]
+    if columns is not None:
+        df = df[list(columns)]
+    return df.reset_index(drop=True)
+
+
+def _write_part(df: pd.DataFrame, pq: Path) -> Path:
+    pq.mkdir(parents=True, exist_ok=True)
+    part = pq / f"part-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')}.parquet"
+    tmp = part.with_name("." + part.name + ".tmp")
+    df.to_parquet(tmp, engine="pyarrow", index=False, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp, part)
+    return part
+
+
+def write_table(df: pd.DataFrame, path, storage_format: str | None = None) -> Path:
+    """Replace a dataset. Returns the path written (the CSV path or its Parquet dataset)."""
+    storage_format = storage_format or STORAGE_FORMAT
+    if storage_format == "csv":
+        df.to_csv(path, index=False)
+        return Path(path)
+
+    pq = parquet_path(path)
+    staging = pq.with_name("." + pq.name + ".new")
+    shutil.rmtree(staging, ignore_errors=True)
+    _write_part(apply_schema(df), staging)
+    shutil.rmtree(pq, ignore_errors=True)
+    os.replace(staging, pq)
+    return pq
+
+
+def append_table(df: pd.DataFrame, path, storage_format: str | None = None) -> Path:
+    """Append rows to a dataset: one new part file in Parquet mode, appended lines in CSV mode."""
+    storage_format = storage_format or STORAGE_FORMAT
+    if df.empty:
+        return Path(path)
+    if storage_format == "csv":
+        df.to_csv(path, mode="a", header=not Path(path).exists(), index=False)
+        return Path(path)
+    return _write_part(apply_schema(df), parquet_path(path))
+
+
+def _size_bytes(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.iterdir())
+    return path.stat().st_size
+
+
+def convert(data_dir: Path = DATA_DIR) -> None:
+    if not HAS_PYARROW:
+        raise SystemExit("pyarrow is required for Parquet storage (pip install pyarrow)")
+
+    for csv in sorted(data_dir.glob("*.csv")):
+        t0 = time.perf_counter()
+        df = apply_schema(pd.read_csv(csv))
+        csv_load = time.perf_counter() - t0
+
+        pq = write_table(df, csv, storage_format="parquet")
+
+        t0 = time.perf_counter()
+        pd.read_parquet(pq)
+        pq_load = time.perf_counter() - t0
+
+        print(
+            f"{csv.name}: {len(df):,} rows | "
+            f"csv {_size_bytes(csv) / 1024:,.0f} KB, {csv_load * 1000:.0f} ms | "
+            f"parquet {_size_bytes(pq) / 1024:,.0f} KB, {pq_load * 1000:.0f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar storage for data_api_football")
+    parser.add_argument("command", choices=["convert"])
+    args = parser.parse_args()
+    if args.command == "convert":
+        convert()
+
+
+if __name__ == "__main__":
+    main()
@@ -115,3 +115,226 @@ ON CONFLICT (fixture_id) DO UPDATE SET
 
 -- Drop the old predictions table
 ALTER TABLE predictions RENAME TO predictions_legacy;
+
+-- Model version (registry version name) that produced each live prediction
+ALTER TABLE predictions_live
+  ADD COLUMN IF NOT EXISTS model_version TEXT;
+
+-- Unordered team-pair lookup for local head-to-head aggregation
+CREATE INDEX IF NOT EXISTS idx_fixtures_team_pair
+  ON fixtures (LEAST(home_team_id, away_team_id), GREATEST(home_team_id, away_team_id), date DESC);
+
+-- Cached API-Football /fixtures/headtohead responses, keyed on the unordered team pair
+CREATE TABLE IF NOT EXISTS h2h_api_cache (
+  team_lo INT NOT NULL,
+  team_hi INT NOT NULL,
+  last_n INT NOT NULL,
+  response JSONB NOT NULL,
+  latest_meeting TIMESTAMPTZ,  -- newest finished meeting in fixtures when the response was fetched
+  fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  last_used_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (team_lo, team_hi)
+);
+
+CREATE INDEX IF NOT EXISTS idx_h2h_api_cache_last_used
+  ON h2h_api_cache (last_used_at);
+
+-- Newest live predictions first (fetch_live_predictions)
+CREATE INDEX IF NOT EXISTS idx_predictions_live_created_at
+  ON predictions_live (created_at DESC);
+
+-- Append-only in-play probability trajectory, one row per predicted live event.
+-- event_time is the Kafka timestamp of the source event, so a replayed event hits the
+-- primary key and is skipped instead of duplicated.
+-- Monthly range partitions are created on demand by db_pg.ensure_history_partitions().
+CREATE TABLE IF NOT EXISTS predictions_live_history (
+  fixture_id BIGINT NOT NULL,
+  event_time TIMESTAMPTZ NOT NULL,
+  elapsed INT,
+  status TEXT,
+  home_goals INT,
+  away_goals INT,
+  prob_away_win REAL,
+  prob_draw REAL,
+  prob_home_win REAL,
+  model_version TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (fixture_id, event_time)
+) PARTITION BY RANGE (event_time);
+
+-- Rows arrive in time order, so a BRIN index stays tiny and prunes "latest events" scans
+CREATE INDEX IF NOT EXISTS idx_predictions_live_history_event_time
+  ON predictions_live_history USING BRIN (event_time);
+
+-- Partitions for the current and next month
+DO $$
+DECLARE
+  m DATE;
+BEGIN
+  FOR i IN 0..1 LOOP
+    m := (date_trunc('month', NOW()) + make_interval(months => i))::date;
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %I PARTITION OF predictions_live_history FOR VALUES FROM (%L) TO (%L)',
+      'predictions_live_history_' || to_char(m, 'YYYY_MM'), m, (m + INTERVAL '1 month')::date
+    );
+  END LOOP;
+END $$;
+
+-- Read model behind /api/matches: fixtures + chosen probabilities in one row, kept in sync by
+-- statement-level triggers on the source tables (one upsert per batch write, not per row).
+-- fillfactor keeps updated rows on their page while live probabilities change.
+CREATE TABLE IF NOT EXISTS match_listing (
+  fixture_id BIGINT PRIMARY KEY,
+  league TEXT NOT NULL,
+  season INT NOT NULL,
+  date TIMESTAMPTZ,
+  home_team TEXT,
+  away_team TEXT,
+  home_goals INT,
+  away_goals INT,
+  status TEXT,
+  prob_home_win REAL,
+  prob_draw REAL,
+  prob_away_win REAL,
+  prob_source TEXT,  -- 'live' | 'prematch' | null
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+) WITH (fillfactor = 80);
+
+-- Keyset pagination order of /api/matches: date (unknown dates last), then fixture_id.
+-- Covering (INCLUDE every column the endpoint returns), so a page is an index-only scan.
+-- Rename the index when its definition changes: IF NOT EXISTS keeps an old one with the same name.
+DROP INDEX IF EXISTS idx_match_listing_league_season_date;
+DROP INDEX IF EXISTS idx_match_listing_league_season_status_date;
+
+CREATE INDEX IF NOT EXISTS idx_match_listing_keyset
+  ON match_listing (league, season, (COALESCE(date, 'infinity'::timestamptz)), fixture_id)
+  INCLUDE (date, home_team, away_team, home_goals, away_goals, status,
+           prob_home_win, prob_draw, prob_away_win, prob_source);
+
+CREATE INDEX IF NOT EXISTS idx_match_listing_status_keyset
+  ON match_listing (league, season, status, (COALESCE(date, 'infinity'::timestamptz)), fixture_id)
+  INCLUDE (date, home_team, away_team, home_goals, away_goals,
+           prob_home_win, prob_draw, prob_away_win, prob_source);
+
+CREATE OR REPLACE FUNCTION match_listing_refresh(ids BIGINT[]) RETURNS void AS $$
+  DELETE FROM match_listing ml
+  WHERE ml.fixture_id = ANY(ids)
+    AND NOT EXISTS (SELECT 1 FROM fixtures f WHERE f.fixture_id = ml.fixture_id);
+
+  INSERT INTO match_listing (
+    fixture_id, league, season, date, home_team, away_team, home_goals, away_goals, status,
+    prob_home_win, prob_draw, prob_away_win, prob_source
+  )
+  SELECT
+    f.fixture_id, f.league, f.season, f.date, f.home_team, f.away_team, f.home_goals, f.away_goals, f.status,
+    -- choose live if present, otherwise prematch
+    COALESCE(pl.prob_home_win, pp.prob_home_win),
+    COALESCE(pl.prob_draw,     pp.prob_draw),
+    COALESCE(pl.prob_away_win, pp.prob_away_win),
+    CASE
+      WHEN pl.fixture_id IS NOT NULL THEN 'live'
+      WHEN pp.fixture_id IS NOT NULL THEN 'prematch'
+      ELSE NULL
+    END
+  FROM fixtures f
+  LEFT JOIN predictions_prematch pp ON pp.fixture_id = f.fixture_id
+  LEFT JOIN predictions_live     pl ON pl.fixture_id = f.fixture_id
+  WHERE f.fixture_id = ANY(ids)
+  ON CONFLICT (fixture_id) DO UPDATE SET
+    league = EXCLUDED.league,
+    season = EXCLUDED.season,
+    date = EXCLUDED.date,
+    home_team = EXCLUDED.home_team,
+    away_team = EXCLUDED.away_team,
+    home_goals = EXCLUDED.home_goals,
+    away_goals = EXCLUDED.away_goals,
+    status = EXCLUDED.status,
+    prob_home_win = EXCLUDED.prob_home_win,
+    prob_draw = EXCLUDED.prob_draw,
+    prob_away_win = EXCLUDED.prob_away_win,
+    prob_source = EXCLUDED.prob_source,
+    updated_at = NOW()
+  -- skip rewriting rows that didn't change (e.g. an upsert that only bumped updated_at)
+  WHERE (match_listing.league, match_listing.season, match_listing.date, match_listing.home_team,
+         match_listing.away_team, match_listing.home_goals, match_listing.away_goals, match_listing.status,
+         match_listing.prob_home_win, match_listing.prob_draw, match_listing.prob_away_win, match_listing.prob_source)
+        IS DISTINCT FROM
+        (EXCLUDED.league, EXCLUDED.season, EXCLUDED.date, EXCLUDED.home_team,
+         EXCLUDED.away_team, EXCLUDED.home_goals, EXCLUDED.away_goals, EXCLUDED.status,
+         EXCLUDED.prob_home_win, EXCLUDED.prob_draw, EXCLUDED.prob_away_win, EXCLUDED.prob_source);
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION match_listing_sync() RETURNS trigger AS $$
+DECLARE
+  pairs TEXT;
+BEGIN
+  -- an upsert fires both the insert and the update trigger, one of them usually with no rows
+  IF NOT EXISTS (SELECT 1 FROM changed_rows) THEN
+    RETURN NULL;
+  END IF;
+  -- Serialize writers per fixture: without it two transactions touching the same fixture through
+  -- different tables (fixtures vs predictions_live) each rebuild the row from a snapshot missing the
+  -- other's write, and the last upsert wins. Taken in its own statement (sorted, no deadlocks between
+  -- batches), so the refresh below starts with a snapshot that sees the previous holder's commit.
+  PERFORM pg_advisory_xact_lock(fixture_id)
+  FROM (SELECT DISTINCT fixture_id FROM changed_rows ORDER BY fixture_id) s;
+  PERFORM match_listing_refresh(ARRAY(SELECT DISTINCT fixture_id FROM changed_rows));
+
+  -- Tell the backend's response cache which [league, season] listings changed
+  -- ('[]' = unknown, e.g. deleted fixtures or a payload over the NOTIFY size limit)
+  SELECT json_agg(DISTINCT jsonb_build_array(f.league, f.season))::text INTO pairs
+  FROM changed_rows c
+  JOIN fixtures f ON f.fixture_id = c.fixture_id;
+  IF pairs IS NULL OR length(pairs) > 7900 THEN
+    pairs := '[]';
+  END IF;
+  PERFORM pg_notify('match_listing_changed', pairs);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger, hence insert / update / delete triggers per table
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['fixtures', 'predictions_prematch', 'predictions_live'] LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_match_listing_ins', t);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_match_listing_upd', t);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_match_listing_del', t);
+    EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS changed_rows '
+                   'FOR EACH STATEMENT EXECUTE FUNCTION match_listing_sync()', t || '_match_listing_ins', t);
+    EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING NEW TABLE AS changed_rows '
+                   'FOR EACH STATEMENT EXECUTE FUNCTION match_listing_sync()', t || '_match_listing_upd', t);
+    EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS changed_rows '
+                   'FOR EACH STATEMENT EXECUTE FUNCTION match_listing_sync()', t || '_match_listing_del', t);
+  END LOOP;
+END $$;
+
+-- Backfill from the existing rows
+SELECT match_listing_refresh(ARRAY(SELECT fixture_id FROM fixtures));
+
+-- Fixture ids of every predictions_live write, for the backend's live prediction stream (SSE)
+-- ('[]' = too many to list, the stream then re-sends the latest predictions)
+CREATE OR REPLACE FUNCTION live_predictions_notify() RETURNS trigger AS $$
+DECLARE
+  ids TEXT;
+BEGIN
+  SELECT json_agg(DISTINCT fixture_id)::text INTO ids FROM changed_rows;
+  IF ids IS NULL THEN
+    RETURN NULL;
+  END IF;
+  IF length(ids) > 7900 THEN
+    ids := '[]';
+  END IF;
+  PERFORM pg_notify('live_predictions_changed', ids);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS predictions_live_notify_ins ON predictions_live;
+DROP TRIGGER IF EXISTS predictions_live_notify_upd ON predictions_live;
+CREATE TRIGGER predictions_live_notify_ins AFTER INSERT ON predictions_live REFERENCING NEW TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION live_predictions_notify();
+CREATE TRIGGER predictions_live_notify_upd AFTER UPDATE ON predictions_live REFERENCING NEW TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION live_predictions_notify();
@@ -1,11 +1,27 @@
 import os
+import time
+import atexit
+import threading
+from collections import deque
+from contextlib import contextmanager
 import psycopg2
-from psycopg2.extras import execute_values, RealDictCursor
+from psycopg2 import pool as pg_pool
+from psycopg2.extras import execute_values, RealDictCursor, Json
 from dotenv import load_dotenv
 import math
+import json
+from datetime import datetime, timedelta, timezone
 
 load_dotenv()
 
+# Connection pool settings (shared by every helper in this module and the Flask backend)
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "10"))
+PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "30"))  #seconds to wait for a free connection
+PG_POOL_HEALTHCHECK_SECONDS = float(os.getenv("PG_POOL_HEALTHCHECK_SECONDS", "60"))  #ping connections idle longer than this
+PG_CONNECT_RETRIES = int(os.getenv("PG_CONNECT_RETRIES", "3"))
+PG_CONNECT_BACKOFF = float(os.getenv("PG_CONNECT_BACKOFF", "0.5"))  #seconds, doubled after each failed attempt
+
 def clean(v):
     # Convert pandas/numpy NaN → None
     if v is None:
@@ -27,14 +43,174 @@ def clean(v):
     return v
 
 
-def get_db_connection():
-    return psycopg2.connect(
+def _connect_kwargs():
+    return dict(
         host = os.getenv("PGHOST", "localhost"),
         port = os.getenv("PGPORT", "5432"),
         dbname = os.getenv("PGDATABASE"),
         user = os.getenv("PGUSER"),
         password = os.getenv("PGPASSWORD")
     )
+
+
+def get_db_connection():
+    # Dedicated (unpooled) connection, caller must close it
+    return psycopg2.connect(**_connect_kwargs())
+
+
+class FairSlots:
+    """
+    FIFO counting semaphore: a released slot goes straight to the longest waiter, so a caller
+    that gives its connection back can't grab it again ahead of the queue (gevent's Semaphore
+    allows that, which starves some requests under load).
+    """
+    def __init__(self, n: int):
+        self._free = n
+        self._lock = threading.Lock()
+        self._waiters = deque()
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return True
+            ready = threading.Event()
+            self._waiters.append(ready)
+        if ready.wait(timeout):
+            return True
+        with self._lock:
+            try:
+                self._waiters.remove(ready)
+                return False
+            except ValueError:
+                return True  #handed a slot just as the wait timed out
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._free += 1
+
+
+_pool = None
+_pool_pid = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+_last_used = {}  # id(conn) -> monotonic time the connection was returned to the pool
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use (or after a fork)."""
+    global _pool, _pool_pid, _pool_slots
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            # Connections inherited from a parent process must not be reused, just drop them
+            _last_used.clear()
+            last_err = None
+            delay = PG_CONNECT_BACKOFF
+            for attempt in range(PG_CONNECT_RETRIES):
+                try:
+                    _pool = pg_pool.ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, **_connect_kwargs())
+                    break
+                except psycopg2.OperationalError as ex:
+                    last_err = ex
+                    print(f"[DB POOL] connect failed (attempt {attempt + 1}/{PG_CONNECT_RETRIES}): {ex}")
+                    time.sleep(delay)
+                    delay *= 2
+            else:
+                raise last_err
+            _pool_pid = pid
+            _pool_slots = FairSlots(PG_POOL_MAX)
+    return _pool
+
+
+def close_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
+        _last_used.clear()
+
+atexit.register(close_pool)
+
+
+def _is_healthy(conn) -> bool:
+    if conn.closed:
+        return False
+    last = _last_used.get(id(conn))
+    if last is not None and time.monotonic() - last < PG_POOL_HEALTHCHECK_SECONDS:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+
+def _checkout(p):
+    # Replace broken connections (server restart, idle timeout) transparently
+    last_err = None
+    delay = PG_CONNECT_BACKOFF
+    for attempt in range(PG_CONNECT_RETRIES):
+        try:
+            conn = p.getconn()
+        except psycopg2.OperationalError as ex:
+            last_err = ex
+            print(f"[DB POOL] reconnect failed (attempt {attempt + 1}/{PG_CONNECT_RETRIES}): {ex}")
+            time.sleep(delay)
+            delay *= 2
+            continue
+        if _is_healthy(conn):
+            return conn
+        _last_used.pop(id(conn), None)
+        p.putconn(conn, close=True)
+    raise last_err or psycopg2.OperationalError("could not obtain a healthy connection from the pool")
+
+
+@contextmanager
+def db_connection():
+    """
+    Check a pooled connection out for the current thread and return it afterwards.
+    Use together with `with conn:` for the transaction, e.g.
+
+        with db_connection() as conn, conn, conn.cursor() as cur:
+            cur.execute(...)
+    """
+    p = get_pool()
+    slots = _pool_slots
+    if not slots.acquire(timeout=PG_POOL_TIMEOUT):
+        raise pg_pool.PoolError(f"no free connection in pool after {PG_POOL_TIMEOUT}s (PG_POOL_MAX={PG_POOL_MAX})")
+    try:
+        conn = _checkout(p)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            broken = broken or bool(conn.closed)
+            if broken:
+                _last_used.pop(id(conn), None)
+            else:
+                _last_used[id(conn)] = time.monotonic()
+            # the pool may have been closed/recreated meanwhile (close_pool at exit)
+            if p is _pool:
+                p.putconn(conn, close=broken)
+            elif not conn.closed:
+                conn.close()
+    finally:
+        slots.release()
+
  # Insert multiple fixture rows
 def insert_fixtures(rows):
     if not rows:
@@ -77,13 +253,15 @@ def insert_fixtures(rows):
         for r in rows
     ]
 
-    conn = get_db_connection()
-    try:
+    with db_connection() as conn:
         with conn, conn.cursor() as cur:
             execute_values(cur, sql, values)
         return len(rows)
-    finally:
-        conn.close()
+
+MATCH_STATS_COLS = [
+    "home_shots_total","home_shots_inbox","home_possession","home_pass_accuracy","home_corners","home_fouls",
+    "away_shots_total","away_shots_inbox","away_possession","away_pass_accuracy","away_corners","away_fouls",
+]
 
 # Insert match stats row 
 def insert_match_stats(fixture_id, stats: dict) -> int:
@@ -115,18 +293,37 @@ def insert_match_stats(fixture_id, stats: dict) -> int:
     """
 
     payload = {"fixture_id": fixture_id}
-    payload.update({k: stats.get(k) for k in [
-        "home_shots_total","home_shots_inbox","home_possession","home_pass_accuracy","home_corners","home_fouls",
-        "away_shots_total","away_shots_inbox","away_possession","away_pass_accuracy","away_corners","away_fouls",
-    ]})
+    payload.update({k: stats.get(k) for k in MATCH_STATS_COLS})
 
-    conn = get_db_connection() 
-    try:
+    with db_connection() as conn:
         with conn, conn.cursor() as cur:
             cur.execute(sql, payload)
         return 1
-    finally:
-        conn.close()
+
+# Insert many match stats rows in one statement (rows: dicts with fixture_id + stats columns)
+def insert_match_stats_batch(rows: list[dict]) -> int:
+    if not rows:
+        return 0
+
+    cols = ", ".join(MATCH_STATS_COLS)
+    updates = ",\n      ".join(f"{c} = EXCLUDED.{c}" for c in MATCH_STATS_COLS)
+    sql = f"""
+    INSERT INTO match_stats (fixture_id, {cols})
+    VALUES %s
+    ON CONFLICT (fixture_id) DO UPDATE SET
+      {updates},
+      updated_at = NOW();
+    """
+
+    values = [
+        (clean(r["fixture_id"]), *(clean(r.get(c)) for c in MATCH_STATS_COLS))
+        for r in rows
+    ]
+
+    with db_connection() as conn:
+        with conn, conn.cursor() as cur:
+            execute_values(cur, sql, values, page_size=500)
+        return len(values)
 
 # Insert prediction row
 # def insert_prediction(fixture_id: int, probs: dict, meta: dict) -> int:
@@ -181,8 +378,7 @@ def insert_prematch_prediction(fixture_id: int, probs: dict, meta: dict) -> int:
       prob_home_win = EXCLUDED.prob_home_win,
       created_at = NOW();
     """
-    conn = get_db_connection()
-    try:
+    with db_connection() as conn:
         with conn, conn.cursor() as cur:
             cur.execute(sql, (
                 fixture_id,
@@ -195,17 +391,15 @@ def insert_prematch_prediction(fixture_id: int, probs: dict, meta: dict) -> int:
                 probs.get("prob_home_win"),
             ))
         return 1
-    finally:
-        conn.close()
 
 #Live Predictions: match stats features
 def insert_live_prediction(fixture_id: int, probs: dict, meta: dict) -> int:
     sql = """
     INSERT INTO predictions_live (
       fixture_id, league, season, home_team, away_team,
-      prob_away_win, prob_draw, prob_home_win
+      prob_away_win, prob_draw, prob_home_win, model_version
     )
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
     ON CONFLICT (fixture_id) DO UPDATE SET
       league = EXCLUDED.league,
       season = EXCLUDED.season,
@@ -214,10 +408,10 @@ def insert_live_prediction(fixture_id: int, probs: dict, meta: dict) -> int:
       prob_away_win = EXCLUDED.prob_away_win,
       prob_draw = EXCLUDED.prob_draw,
       prob_home_win = EXCLUDED.prob_home_win,
+      model_version = EXCLUDED.model_version,
       created_at = NOW();
     """
-    conn = get_db_connection()
-    try:
+    with db_connection() as conn:
         with conn, conn.cursor() as cur:
             cur.execute(sql, (
                 fixture_id,
@@ -228,10 +422,111 @@ def insert_live_prediction(fixture_id: int, probs: dict, meta: dict) -> int:
                 probs.get("prob_away_win"),
                 probs.get("prob_draw"),
                 probs.get("prob_home_win"),
+                meta.get("model_version"),
             ))
         return 1
-    finally:
-        conn.close()
+
+# Insert many live predictions in one statement
+# rows: dicts with fixture_id, league, season, home_team, away_team, prob_away_win, prob_draw, prob_home_win, model_version
+def insert_live_predictions_batch(rows: list[dict]) -> int:
+    if not rows:
+        return 0
+
+    sql = """
+    INSERT INTO predictions_live (
+      fixture_id, league, season, home_team, away_team,
+      prob_away_win, prob_draw, prob_home_win, model_version
+    )
+    VALUES %s
+    ON CONFLICT (fixture_id) DO UPDATE SET
+      league = EXCLUDED.league,
+      season = EXCLUDED.season,
+      home_team = EXCLUDED.home_team,
+      away_team = EXCLUDED.away_team,
+      prob_away_win = EXCLUDED.prob_away_win,
+      prob_draw = EXCLUDED.prob_draw,
+      prob_home_win = EXCLUDED.prob_home_win,
+      model_version = EXCLUDED.model_version,
+      created_at = NOW();
+    """
+
+    values = [
+        (
+            clean(r["fixture_id"]),
+            clean(r.get("league")),
+            clean(r.get("season")),
+            clean(r.get("home_team")),
+            clean(r.get("away_team")),
+            clean(r.get("prob_away_win")),
+            clean(r.get("prob_draw")),
+            clean(r.get("prob_home_win")),
+            r.get("model_version"),
+        )
+        for r in rows
+    ]
+
+    with db_connection() as conn:
+        with conn, conn.cursor() as cur:
+            execute_values(cur, sql, values, page_size=500)
+        return len(values)
+
+# Monthly partitions of predictions_live_history already known to exist (per process)
+_history_partitions = set()
+
+def _month_start(t: datetime) -> datetime:
+    return t.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def ensure_history_partitions(times) -> None:
+    # Create the monthly partitions covering `times`; the advisory lock serializes workers creating the same one
+    months = {_month_start(t) for t in times} - _history_partitions
+    for month in sorted(months):
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        name = f"predictions_live_history_{month:%Y_%m}"
+        with db_connection() as conn:
+            with conn, conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s));", (name,))
+                cur.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF predictions_live_history "
+                    "FOR VALUES FROM (%s) TO (%s);",
+                    (month, next_month),
+                )
+        _history_partitions.add(month)
+
+# Append live predictions to the trajectory table, replayed events (same fixture_id + event_time) are skipped
+def insert_live_predictions_history_batch(rows: list[dict]) -> int:
+    if not rows:
+        return 0
+    ensure_history_partitions(r["event_time"] for r in rows)
+
+    sql = """
+    INSERT INTO predictions_live_history (
+      fixture_id, event_time, elapsed, status, home_goals, away_goals,
+      prob_away_win, prob_draw, prob_home_win, model_version
+    )
+    VALUES %s
+    ON CONFLICT (fixture_id, event_time) DO NOTHING;
+    """
+
+    values = [
+        (
+            clean(r["fixture_id"]),
+            r["event_time"],
+            clean(r.get("elapsed")),
+            clean(r.get("status")),
+            clean(r.get("home_goals")),
+            clean(r.get("away_goals")),
+            clean(r.get("prob_away_win")),
+            clean(r.get("prob_draw")),
+            clean(r.get("prob_home_win")),
+            r.get("model_version"),
+        )
+        for r in rows
+    ]
+
+    with db_connection() as conn:
+        with conn, conn.cursor() as cur:
+            execute_values(cur, sql, values, page_size=500)
+            return cur.rowcount
 
 #Fetch fixtures needing h2h update
 def fetch_fixtures_h2h(limit: int = 2000, stale_hours: int = 12):
@@ -256,14 +551,118 @@ def fetch_fixtures_h2h(limit: int = 2000, stale_hours: int = 12):
     ORDER BY f.date ASC NULLS LAST
     LIMIT %s;
     """
-    conn = get_db_connection()
-    try:
+    with db_connection() as conn:
         with conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(sql, (limit,))
             # Return list of dicts
             return [dict(r) for r in (cur.fetchall() or [])]
-    finally:
-        conn.close()
+
+# Earliest upcoming kickoff (fixtures still NS, kicked off at most grace_minutes ago), None if nothing is scheduled
+def fetch_next_kickoff(grace_minutes: int = 150):
+    sql = """
+    SELECT MIN(date)
+    FROM fixtures
+    WHERE status IN ('NS', 'TBD')
+      AND date > NOW() - make_interval(mins => %s);
+    """
+    with db_connection() as conn:
+        with conn, conn.cursor() as cur:
+            cur.execute(sql, (int(grace_minutes),))
+            row = cur.fetchone()
+            return row[0] if row else None
+
+# Head-to-head features for many fixtures in one set-based pass over the local fixtures table.
+# Same outputs as build_h2h_features (last N finished meetings, from the upcoming home team's view).
+# fixture_ids=None -> every fixture that fetch_fixtures_h2h would return.
+def fetch_h2h_from_fixtures(fixture_ids: list[int] | None = None, last: int = 10,
+                            limit: int = 2000, stale_hours: int = 12) -> list[dict]:
+    if fixture_ids is not None:
+        pending_sql = """
+        SELECT f.fixture_id, f.date, f.home_team_id, f.away_team_id
+        FROM fixtures f
+        WHERE f.fixture_id = ANY(%(fixture_ids)s)
+          AND f.home_team_id IS NOT NULL
+          AND f.away_team_id IS NOT NULL
+        """
+    else:
+        pending_sql = """
+        SELECT f.fixture_id, f.date, f.home_team_id, f.away_team_id
+        FROM fixtures f
+        LEFT JOIN prematch_h2h h
+          ON h.fixture_id = f.fixture_id
+        WHERE f.status = 'NS'
+          AND f.home_team_id IS NOT NULL
+          AND f.away_team_id IS NOT NULL
+          AND (
+                h.updated_at IS NULL
+                OR h.updated_at < NOW() - make_interval(hours => %(stale_hours)s)
+              )
+        ORDER BY f.date ASC NULLS LAST
+        LIMIT %(limit)s
+        """
+
+    sql = f"""
+    WITH pending AS ({pending_sql}),
+    meetings AS (
+      SELECT
+        p.fixture_id,
+        CASE WHEN m.home_team_id = p.home_team_id THEN m.home_goals ELSE m.away_goals END AS gf,
+        CASE WHEN m.home_team_id = p.home_team_id THEN m.away_goals ELSE m.home_goals END AS ga,
+        ROW_NUMBER() OVER (PARTITION BY p.fixture_id ORDER BY m.date DESC, m.fixture_id DESC) AS rn
+      FROM pending p
+      JOIN fixtures m
+        ON LEAST(m.home_team_id, m.away_team_id) = LEAST(p.home_team_id, p.away_team_id)
+       AND GREATEST(m.home_team_id, m.away_team_id) = GREATEST(p.home_team_id, p.away_team_id)
+      WHERE m.fixture_id <> p.fixture_id
+        AND m.home_goals IS NOT NULL
+        AND m.away_goals IS NOT NULL
+        AND m.status IN ('FT', 'AET', 'PEN')
+        AND (p.date IS NULL OR m.date < p.date)
+    )
+    SELECT
+      p.fixture_id,
+      p.home_team_id,
+      p.away_team_id,
+      COUNT(m.fixture_id) AS h2h_matches,
+      COUNT(*) FILTER (WHERE m.gf > m.ga) AS h2h_home_wins,
+      COUNT(*) FILTER (WHERE m.gf = m.ga) AS h2h_draws,
+      COUNT(*) FILTER (WHERE m.gf < m.ga) AS h2h_away_wins,
+      COALESCE(AVG(m.gf), 0) AS h2h_home_goals_for,
+      COALESCE(AVG(m.ga), 0) AS h2h_home_goals_against,
+      COALESCE(AVG(m.gf - m.ga), 0) AS h2h_home_goal_diff
+    FROM pending p
+    LEFT JOIN meetings m
+      ON m.fixture_id = p.fixture_id
+     AND m.rn <= %(last)s
+    GROUP BY p.fixture_id, p.home_team_id, p.away_team_id;
+    """
+    params = {
+        "fixture_ids": [int(x) for x in fixture_ids] if fixture_ids is not None else None,
+        "last": last,
+        "limit": limit,
+        "stale_hours": stale_hours,
+    }
+    with db_connection() as conn:
+        with conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall() or []
+
+    return [
+        {
+            "fixture_id": int(r["fixture_id"]),
+            "home_team_id": int(r["home_team_id"]),
+            "away_team_id": int(r["away_team_id"]),
+            "h2h_last": int(last),
+            "h2h_matches": int(r["h2h_matches"]),
+            "h2h_home_wins": int(r["h2h_home_wins"]),
+            "h2h_draws": int(r["h2h_draws"]),
+            "h2h_away_wins": int(r["h2h_away_wins"]),
+            "h2h_home_goals_for": float(r["h2h_home_goals_for"]),
+            "h2h_home_goals_against": float(r["h2h_home_goals_against"]),
+            "h2h_home_goal_diff": float(r["h2h_home_goal_diff"]),
+        }
+        for r in rows
+    ]
 
 # Insert prematch h2h features
 def insert_prematch_h2h(rows: list[dict]) -> int:
@@ -311,14 +710,113 @@ def insert_prematch_h2h(rows: list[dict]) -> int:
             None,  # updated_at handled by NOW()
         ))
 
-    conn = get_db_connection()
-    try:
+    with db_connection() as conn:
         with conn, conn.cursor() as cur:
             execute_values(cur, sql, values, page_size=500)
         conn.commit()
         return len(values)
-    finally:
-        conn.close()
+
+# Cached /fixtures/headtohead response for an unordered team pair (see h2h_cache.py).
+# Returned (and marked as recently used) only while it is still valid:
+#   - it holds at least `last` meetings,
+#   - it is younger than `ttl_hours`,
+#   - no finished meeting newer than the one known at fetch time has landed in fixtures since.
+def get_h2h_cache(team1_id: int, team2_id: int, last: int, ttl_hours: float):
+    sql = """
+    UPDATE h2h_api_cache c
+    SET last_used_at = NOW()
+    WHERE c.team_lo = %(lo)s
+      AND c.team_hi = %(hi)s
+      AND c.last_n >= %(last)s
+      AND c.fetched_at > NOW() - make_interval(secs => %(ttl_seconds)s)
+      AND COALESCE(c.latest_meeting, '-infinity') >= COALESCE((
+            SELECT MAX(f.date)
+            FROM fixtures f
+            WHERE LEAST(f.home_team_id, f.away_team_id) = %(lo)s
+              AND GREATEST(f.home_team_id, f.away_team_id) = %(hi)s
+              AND f.status IN ('FT', 'AET', 'PEN')
+          ), '-infinity')
+    RETURNING c.response, c.last_n;
+    """
+    lo, hi = sorted((int(team1_id), int(team2_id)))
+    with db_connection() as conn:
+        with conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(sql, {"lo": lo, "hi": hi, "last": int(last), "ttl_seconds": float(ttl_hours) * 3600})
+            row = cur.fetchone()
+            return dict(row) if row else None
+
+# Store a /fixtures/headtohead response, then evict least recently used pairs above max_entries
+def put_h2h_cache(team1_id: int, team2_id: int, last: int, response: list, max_entries: int) -> int:
+    upsert_sql = """
+    INSERT INTO h2h_api_cache (team_lo, team_hi, last_n, response, latest_meeting, fetched_at, last_used_at)
+    VALUES (
+      %(lo)s, %(hi)s, %(last)s, %(response)s,
+      (
+        SELECT MAX(f.date)
+        FROM fixtures f
+        WHERE LEAST(f.home_team_id, f.away_team_id) = %(lo)s
+          AND GREATEST(f.home_team_id, f.away_team_id) = %(hi)s
+          AND f.status IN ('FT', 'AET', 'PEN')
+      ),
+      NOW(), NOW()
+    )
+    ON CONFLICT (team_lo, team_hi) DO UPDATE SET
+      last_n = EXCLUDED.last_n,
+      response = EXCLUDED.response,
+      latest_meeting = EXCLUDED.latest_meeting,
+      fetched_at = EXCLUDED.fetched_at,
+      last_used_at = EXCLUDED.last_used_at;
+    """
+    evict_sql = """
+    DELETE FROM h2h_api_cache c
+    USING (
+      SELECT team_lo, team_hi
+      FROM h2h_api_cache
+      ORDER BY last_used_at DESC
+      OFFSET %(max_entries)s
+    ) old
+    WHERE c.team_lo = old.team_lo
+      AND c.team_hi = old.team_hi;
+    """
+    lo, hi = sorted((int(team1_id), int(team2_id)))
+    with db_connection() as conn:
+        with conn, conn.cursor() as cur:
+            cur.execute(upsert_sql, {"lo": lo, "hi": hi, "last": int(last), "response": Json(response)})
+            cur.execute(evict_sql, {"max_entries": int(max_entries)})
+            return cur.rowcount
+
+# Fetch finished fixtures (with stats) changed after `since`, for the incremental feature store
+def fetch_finished_matches_with_stats(since: tuple | None = None, limit: int = 50000):
+    # since = (changed_at, fixture_id) of the last row already pulled; paging on the pair, not on
+    # changed_at alone, so rows sharing a timestamp across the LIMIT boundary aren't skipped
+    since_at, since_id = since if since is not None else (None, None)
+    stats_cols = ",\n      ".join(f"s.{c}" for c in MATCH_STATS_COLS)
+    sql = f"""
+    SELECT
+      f.fixture_id,
+      f.league,
+      f.season,
+      f.date,
+      f.home_team,
+      f.away_team,
+      f.home_goals,
+      f.away_goals,
+      {stats_cols},
+      GREATEST(f.updated_at, s.updated_at) AS changed_at
+    FROM fixtures f
+    JOIN match_stats s ON s.fixture_id = f.fixture_id
+    WHERE f.status IN ('FT', 'AET', 'PEN')
+      AND f.home_goals IS NOT NULL
+      AND f.away_goals IS NOT NULL
+      AND (%(since_at)s::timestamptz IS NULL
+           OR (GREATEST(f.updated_at, s.updated_at), f.fixture_id) > (%(since_at)s::timestamptz, %(since_id)s))
+    ORDER BY changed_at ASC, f.fixture_id ASC
+    LIMIT %(limit)s;
+    """
+    with db_connection() as conn:
+        with conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(sql, {"since_at": since_at, "since_id": since_id, "limit": limit})
+            return [dict(r) for r in (cur.fetchall() or [])]
 
 # Fetch distinct leagues from fixtures
 def fetch_leagues_from_db():
@@ -327,14 +825,11 @@ def fetch_leagues_from_db():
     FROM fixtures
     ORDER BY league ASC;
     """
-    conn = get_db_connection()
-    try:
+    with db_connection() as conn:
         with conn, conn.cursor() as cur:
             cur.execute(sql)
             rows = cur.fetchall()
             return [r[0] for r in rows]
-    finally:
-        conn.close()
 
 # Fetch distinct seasons from fixtures
 def fetch_seasons_from_db(league: str | None = None):
@@ -355,28 +850,121 @@ def fetch_seasons_from_db(league: str | None = None):
         """
         params = None
 
-    conn = get_db_connection()
-    try:
+    with db_connection() as conn:
         with conn, conn.cursor() as cur:
             cur.execute(sql, params)
             rows = cur.fetchall()
             return [r[0] for r in rows]
-    finally:
-        conn.close()
 
 # Fetch Probabilities
-def fetch_matches_with_probs(league: str, season: int, limit: int = 300, upcoming_only: bool = False):
+def _fetch_rows(sql: str, params, as_json: bool = False, json_order: str | None = None):
     """
-    Returns fixtures joined with:
-      - predictions_prematch (prematch probs)
-      - predictions_live (live probs)
-      - prob_source: 'live' | 'prematch' | null
+    Run a SELECT and return its rows, or with as_json=True the same rows as a UTF-8 JSON array
+    built by Postgres (json_agg), ready to send without any per-row Python work.
+    json_order repeats the query's ORDER BY on its output columns (keeps the array in order).
     """
+    sql = sql.strip().rstrip(";")
+    if as_json:
+        order = f" ORDER BY {json_order}" if json_order else ""
+        sql = f"SELECT COALESCE(json_agg(t{order}), '[]')::text FROM ({sql}) t"
+    with db_connection() as conn:
+        with conn, conn.cursor(cursor_factory=None if as_json else RealDictCursor) as cur:
+            cur.execute(sql, params)
+            if as_json:
+                return cur.fetchone()[0].encode("utf-8")
+            return cur.fetchall()
+
+# Sort key of the match listing: date with unknown dates last, then fixture_id (matches the indexes)
+MATCH_SORT_KEY = "COALESCE(date, 'infinity'::timestamptz)"
+
+def _matches_query(league: str, season: int, limit: int, upcoming_only: bool = False, status: str | None = None,
+                   date_from=None, date_to=None, after: tuple | None = None):
     where_extra = ""
+    params = [league, season]
     if upcoming_only:
-        where_extra = "AND (f.status = 'NS' OR (f.home_goals IS NULL AND f.away_goals IS NULL))"
+        where_extra += "AND (status = 'NS' OR (home_goals IS NULL AND away_goals IS NULL))\n"
+    if status:
+        where_extra += "AND status = %s\n"
+        params.append(status)
+    if date_from is not None:  #inclusive
+        where_extra += f"AND {MATCH_SORT_KEY} >= %s AND date IS NOT NULL\n"
+        params.append(date_from)
+    if date_to is not None:  #exclusive
+        where_extra += f"AND {MATCH_SORT_KEY} < %s\n"
+        params.append(date_to)
+    if after is not None:
+        # keyset: rows strictly after the last row of the previous page, (date, fixture_id) with date None = unknown
+        after_date, after_id = after
+        where_extra += f"AND ({MATCH_SORT_KEY}, fixture_id) > (COALESCE(%s::timestamptz, 'infinity'::timestamptz), %s)\n"
+        params.extend([after_date, after_id])
 
     sql = f"""
+    SELECT
+      fixture_id,
+      league,
+      season,
+      date,
+      home_team,
+      away_team,
+      home_goals,
+      away_goals,
+      status,
+      prob_home_win,
+      prob_draw,
+      prob_away_win,
+      prob_source
+    FROM match_listing
+    WHERE league = %s
+      AND season = %s
+      {where_extra}
+    ORDER BY {MATCH_SORT_KEY}, fixture_id
+    LIMIT %s
+    """
+    return sql, (*params, limit)
+
+
+def fetch_matches_with_probs(league: str, season: int, limit: int = 300, upcoming_only: bool = False,
+                             status: str | None = None, as_json: bool = False,
+                             date_from=None, date_to=None, after: tuple | None = None):
+    """
+    Returns fixtures with their probabilities, read from the match_listing read model
+    (kept in sync by triggers on fixtures / predictions_prematch / predictions_live):
+      - prob_home_win / prob_draw / prob_away_win: live if present, otherwise prematch
+      - prob_source: 'live' | 'prematch' | null
+    Ordered by date (unknown dates last) then fixture_id; `after` = (date, fixture_id) of the
+    last row already seen continues from there (keyset pagination).
+    """
+    sql, params = _matches_query(league, season, limit, upcoming_only, status, date_from, date_to, after)
+    return _fetch_rows(sql, params, as_json, f"{MATCH_SORT_KEY}, fixture_id")
+
+
+def fetch_matches_page(league: str, season: int, limit: int = 300, upcoming_only: bool = False,
+                       status: str | None = None, date_from=None, date_to=None, after: tuple | None = None):
+    """
+    One page of fetch_matches_with_probs as Postgres-built JSON bytes, plus the `after` key for the
+    next page ((date iso string or None, fixture_id)), None when this page is the last one.
+    """
+    sql, params = _matches_query(league, season, limit, upcoming_only, status, date_from, date_to, after)
+    sql = f"""
+    SELECT
+      COALESCE(json_agg(t ORDER BY {MATCH_SORT_KEY}, fixture_id), '[]')::text,
+      count(*),
+      (array_agg(to_json(date)::text ORDER BY {MATCH_SORT_KEY} DESC, fixture_id DESC))[1],
+      (array_agg(fixture_id ORDER BY {MATCH_SORT_KEY} DESC, fixture_id DESC))[1]
+    FROM ({sql}) t;
+    """
+    with db_connection() as conn:
+        with conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            body, n, last_date, last_id = cur.fetchone()
+    next_after = None
+    if n >= limit:
+        next_after = (None if last_date in (None, "null") else json.loads(last_date), last_id)
+    return body.encode("utf-8"), next_after
+
+#
+def fetch_live_predictions(limit: int = 50, as_json: bool = False):
+    sql = """
     SELECT
       f.fixture_id,
       f.league,
@@ -386,41 +974,21 @@ def fetch_matches_with_probs(league: str, season: int, limit: int = 300, upcomin
       f.away_team,
       f.home_goals,
       f.away_goals,
-      f.status,
-
-      -- choose live if present, otherwise prematch
-      COALESCE(pl.prob_home_win, pp.prob_home_win) AS prob_home_win,
-      COALESCE(pl.prob_draw,     pp.prob_draw)     AS prob_draw,
-      COALESCE(pl.prob_away_win, pp.prob_away_win) AS prob_away_win,
-
-      CASE
-        WHEN pl.fixture_id IS NOT NULL THEN 'live'
-        WHEN pp.fixture_id IS NOT NULL THEN 'prematch'
-        ELSE NULL
-      END AS prob_source
-
-    FROM fixtures f
-    LEFT JOIN predictions_prematch pp ON pp.fixture_id = f.fixture_id
-    LEFT JOIN predictions_live     pl ON pl.fixture_id = f.fixture_id
-
-    WHERE f.league = %s
-      AND f.season = %s
-      {where_extra}
-
-    ORDER BY f.date ASC NULLS LAST
+      p.prob_home_win,
+      p.prob_draw,
+      p.prob_away_win,
+      p.created_at
+    FROM predictions_live p
+    JOIN fixtures f ON f.fixture_id = p.fixture_id
+    ORDER BY p.created_at DESC
     LIMIT %s;
     """
+    return _fetch_rows(sql, (limit,), as_json, "created_at DESC")
 
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, (league, season, limit))
-            return cur.fetchall()
-    finally:
-        conn.close()
-
-#
-def fetch_live_predictions(limit: int = 50):
+# Same rows as fetch_live_predictions for the given fixtures (live stream updates)
+def fetch_live_predictions_by_ids(fixture_ids: list[int]):
+    if not fixture_ids:
+        return []
     sql = """
     SELECT
       f.fixture_id,
@@ -437,13 +1005,57 @@ def fetch_live_predictions(limit: int = 50):
       p.created_at
     FROM predictions_live p
     JOIN fixtures f ON f.fixture_id = p.fixture_id
-    ORDER BY p.created_at DESC
-    LIMIT %s;
+    WHERE p.fixture_id = ANY(%s)
+    ORDER BY p.created_at;
     """
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, (limit,))
+    with db_connection() as conn:
+        with conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(sql, (list(fixture_ids),))
             return cur.fetchall()
-    finally:
-        conn.close()
\ No newline at end of file
+
+# Probability trajectory of one fixture, oldest first
+def fetch_prediction_trajectory(fixture_id: int, since=None, as_json: bool = False):
+    sql = """
+    SELECT
+      event_time,
+      elapsed,
+      status,
+      home_goals,
+      away_goals,
+      prob_home_win,
+      prob_draw,
+      prob_away_win,
+      model_version
+    FROM predictions_live_history
+    WHERE fixture_id = %s
+      AND (%s::timestamptz IS NULL OR event_time > %s::timestamptz)
+    ORDER BY event_time;
+    """
+    return _fetch_rows(sql, (fixture_id, since, since), as_json, "event_time")
+
+# Latest N prediction events over all fixtures; the time window lets the BRIN index / partition pruning skip old data
+def fetch_latest_prediction_events(limit: int = 50, window_hours: float = 6, as_json: bool = False):
+    sql = """
+    SELECT
+      h.fixture_id,
+      f.league,
+      f.season,
+      f.home_team,
+      f.away_team,
+      h.event_time,
+      h.elapsed,
+      h.status,
+      h.home_goals,
+      h.away_goals,
+      h.prob_home_win,
+      h.prob_draw,
+      h.prob_away_win,
+      h.model_version
+    FROM predictions_live_history h
+    JOIN fixtures f ON f.fixture_id = h.fixture_id
+    WHERE h.event_time >= %s
+    ORDER BY h.event_time DESC
+    LIMIT %s;
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+    return _fetch_rows(sql, (since, limit), as_json, "event_time DESC")
@@ -0,0 +1,204 @@
+import os
+import json
+import struct
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+
+# Compact binary encoding for the match_stats_raw and match_predictions topics.
+#   header: magic (0xB5) | format version | schema id
+#   body:   fixed-layout little-endian struct + length-prefixed UTF-8 strings
+# decode_event() also accepts the plain JSON messages written before this format existed
+# (and still written for other topics, or when an event has keys the schema doesn't know).
+EVENT_FORMAT = os.getenv("EVENT_FORMAT", "binary")  #"binary" | "json" (what producers write)
+
+MAGIC = 0xB5  #never the first byte of a JSON message ("{" is 0x7B)
+FORMAT_VERSION = 1
+SCHEMA_LIVE_STATS = 1
+SCHEMA_PREDICTION = 2
+
+_HEADER = struct.Struct("<BBB")
+_STR_LEN = struct.Struct("<H")
+_NULL_STR = 0xFFFF
+_NULL_INT = -32768
+_NULL_TS = -(2 ** 63)
+
+STATS_KEYS = [
+    "home_shots_total", "home_shots_inbox", "home_possession", "home_pass_accuracy", "home_corners", "home_fouls",
+    "away_shots_total", "away_shots_inbox", "away_possession", "away_pass_accuracy", "away_corners", "away_fouls",
+]
+# fixture_id, kickoff (epoch s), utc offset (min), season, home_goals, away_goals, elapsed, stats null mask, stats
+# (API stats are counts and whole percentages, so float32 holds them exactly)
+_LIVE_FIXED = struct.Struct("<qqhhhhhH" + "f" * len(STATS_KEYS))
+_LIVE_STRINGS = ["mode", "league", "home_team", "away_team", "status_short"]
+LIVE_KEYS = ["mode", "fixture_id", "league", "season", "date", "home_team", "away_team",
+             "home_goals", "away_goals", "status_short", "elapsed"] + STATS_KEYS
+
+# fixture_id, prob_home_win, prob_draw, prob_away_win (+ model_version string)
+_PRED_FIXED = struct.Struct("<qddd")
+PRED_KEYS = ["fixture_id", "prob_home_win", "prob_draw", "prob_away_win", "model_version"]
+
+TOPIC_SCHEMAS = {
+    "match_stats_raw": SCHEMA_LIVE_STATS,
+    "match_predictions": SCHEMA_PREDICTION,
+}
+
+
+def _pack_str(v) -> bytes:
+    if v is None:
+        return _STR_LEN.pack(_NULL_STR)
+    b = str(v).encode("utf-8")
+    if len(b) >= _NULL_STR:
+        raise ValueError("string too long for the binary event format")
+    return _STR_LEN.pack(len(b)) + b
+
+
+def _unpack_str(buf: bytes, pos: int):
+    (n,) = _STR_LEN.unpack_from(buf, pos)
+    pos += _STR_LEN.size
+    if n == _NULL_STR:
+        return None, pos
+    return buf[pos:pos + n].decode("utf-8"), pos + n
+
+
+def _int_or_null(v) -> int:
+    return _NULL_INT if v is None else int(v)
+
+
+def _null_or_int(v: int):
+    return None if v == _NULL_INT else v
+
+
+@lru_cache(maxsize=4096)  #live events of a fixture all carry the same kickoff
+def _pack_date(v):
+    # API dates are ISO strings with an offset, e.g. "2025-03-01T15:00:00+00:00"
+    if v is None:
+        return _NULL_TS, 0
+    dt = datetime.fromisoformat(str(v))
+    if dt.tzinfo is None or dt.microsecond:
+        raise ValueError("date not representable in the binary event format")
+    offset = dt.utcoffset()
+    return int(dt.timestamp()), int(offset.total_seconds() // 60)
+
+
+@lru_cache(maxsize=4096)
+def _unpack_date(ts: int, offset_min: int):
+    if ts == _NULL_TS:
+        return None
+    tz = timezone(timedelta(minutes=offset_min))
+    return datetime.fromtimestamp(ts, tz).isoformat()
+
+
+def encode_live_stats(e: dict) -> bytes:
+    date_ts, date_offset = _pack_date(e.get("date"))
+    null_mask = 0
+    stats = []
+    for i, k in enumerate(STATS_KEYS):
+        v = e.get(k)
+        if v is None:
+            null_mask |= 1 << i
+            stats.append(0.0)
+        else:
+            stats.append(float(v))
+    fixed = _LIVE_FIXED.pack(
+        int(e["fixture_id"]),
+        date_ts,
+        date_offset,
+        _int_or_null(e.get("season")),
+        _int_or_null(e.get("home_goals")),
+        _int_or_null(e.get("away_goals")),
+        _int_or_null(e.get("elapsed")),
+        null_mask,
+        *stats,
+    )
+    strings = b"".join(_pack_str(e.get(k)) for k in _LIVE_STRINGS)
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, SCHEMA_LIVE_STATS) + fixed + strings
+
+
+def decode_live_stats(buf: bytes, pos: int) -> dict:
+    fixture_id, date_ts, date_offset, season, home_goals, away_goals, elapsed, null_mask, *stats = \
+        _LIVE_FIXED.unpack_from(buf, pos)
+    pos += _LIVE_FIXED.size
+    strings = {}
+    for k in _LIVE_STRINGS:
+        strings[k], pos = _unpack_str(buf, pos)
+
+    e = {
+        "mode": strings["mode"],
+        "fixture_id": fixture_id,
+        "league": strings["league"],
+        "season": _null_or_int(season),
+        "date": _unpack_date(date_ts, date_offset),
+        "home_team": strings["home_team"],
+        "away_team": strings["away_team"],
+        "home_goals": _null_or_int(home_goals),
+        "away_goals": _null_or_int(away_goals),
+        "status_short": strings["status_short"],
+        "elapsed": _null_or_int(elapsed),
+    }
+    if null_mask:
+        stats = [None if null_mask & (1 << i) else v for i, v in enumerate(stats)]
+    e.update(zip(STATS_KEYS, stats))
+    return e
+
+
+def encode_prediction(e: dict) -> bytes:
+    fixed = _PRED_FIXED.pack(
+        int(e["fixture_id"]),
+        float(e["prob_home_win"]),
+        float(e["prob_draw"]),
+        float(e["prob_away_win"]),
+    )
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, SCHEMA_PREDICTION) + fixed + _pack_str(e.get("model_version"))
+
+
+def decode_prediction(buf: bytes, pos: int) -> dict:
+    fixture_id, p_home, p_draw, p_away = _PRED_FIXED.unpack_from(buf, pos)
+    model_version, _ = _unpack_str(buf, pos + _PRED_FIXED.size)
+    return {
+        "fixture_id": fixture_id,
+        "prob_home_win": p_home,
+        "prob_draw": p_draw,
+        "prob_away_win": p_away,
+        "model_version": model_version,
+    }
+
+
+_ENCODERS = {
+    SCHEMA_LIVE_STATS: (LIVE_KEYS, encode_live_stats),
+    SCHEMA_PREDICTION: (PRED_KEYS, encode_prediction),
+}
+_DECODERS = {
+    SCHEMA_LIVE_STATS: decode_live_stats,
+    SCHEMA_PREDICTION: decode_prediction,
+}
+
+
+def encode_json(event: dict) -> bytes:
+    return json.dumps(event).encode("utf-8")
+
+
+def encode_event(topic: str, event: dict, event_format: str | None = None) -> bytes:
+    """
+    Serialize an event for `topic`: binary when the topic has a schema and the event fits it,
+    JSON otherwise (unknown keys, odd values, other topics, EVENT_FORMAT=json).
+    """
+    schema = TOPIC_SCHEMAS.get(topic)
+    if (event_format or EVENT_FORMAT) != "binary" or schema is None:
+        return encode_json(event)
+    keys, encoder = _ENCODERS[schema]
+    if not set(event).issubset(keys):
+        return encode_json(event)
+    try:
+        return encoder(event)
+    except (KeyError, TypeError, ValueError, OverflowError, struct.error):
+        return encode_json(event)
+
+
+def decode_event(value: bytes) -> dict:
+    """Deserialize a message value written by encode_event or as plain JSON."""
+    if value and value[0] == MAGIC:
+        _, version, schema = _HEADER.unpack_from(value, 0)
+        if version != FORMAT_VERSION or schema not in _DECODERS:
+            raise ValueError(f"unsupported event format version={version} schema={schema}")
+        return _DECODERS[schema](value, _HEADER.size)
+    return json.loads(value.decode("utf-8"))
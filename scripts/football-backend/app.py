@@ -1,34 +1,52 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from datetime import datetime, date
+from datetime import datetime
 import os,sys
+import json
+import base64
+import binascii
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from db_pg import (
-    fetch_matches_with_probs,
+    fetch_matches_page,
     fetch_live_predictions,
+    fetch_prediction_trajectory,
+    fetch_latest_prediction_events,
     fetch_seasons_from_db,
     fetch_leagues_from_db
 )
+from response_cache import cached
+from live_stream import stream_events
+from compression import gzip_response
+
+# Response cache TTLs (seconds); match listings are also invalidated by the DB on every change
+CACHE_TTL_LEAGUES = float(os.getenv("CACHE_TTL_LEAGUES", "3600"))
+CACHE_TTL_SEASONS = float(os.getenv("CACHE_TTL_SEASONS", "3600"))
+CACHE_TTL_MATCHES = float(os.getenv("CACHE_TTL_MATCHES", "300"))
+MATCHES_MAX_LIMIT = 1000  #largest page /api/matches returns
 
 app = Flask(__name__)
 
 # enable cors
-CORS(app, resources={r"/api/*": {"origins": "*"}})
+CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor"])
+app.after_request(gzip_response)
+
+
+def _json_bytes(body: bytes) -> Response:
+    # row lists come back from db_pg already serialized by Postgres (as_json=True)
+    return Response(body, mimetype="application/json")
 
 
-def _json_safe(v):
-    # psycopg2 returns datetime objects; jsonify can't serialize them
-    if isinstance(v, (datetime, date)):
-        return v.isoformat()
-    return v
+def _encode_cursor(after: tuple) -> str:
+    # opaque page cursor: (date iso string or None, fixture_id) of the last row sent
+    return base64.urlsafe_b64encode(json.dumps(after).encode("utf-8")).decode("ascii").rstrip("=")
 
 
-def _rows_json_safe(rows):
-    out = []
-    for r in rows:
-        out.append({k: _json_safe(v) for k, v in dict(r).items()})
-    return out
+def _decode_cursor(cursor: str) -> tuple:
+    date_iso, fixture_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    if date_iso is not None:
+        datetime.fromisoformat(date_iso)
+    return date_iso, int(fixture_id)
 
 
 @app.route("/")
@@ -36,45 +54,93 @@ def health():
     return "Backend is running. Try /api/leagues"
 
 @app.route("/api/leagues")
+@cached(CACHE_TTL_LEAGUES)
 def get_leagues():
     rows = fetch_leagues_from_db()
     return jsonify([{"league": r} for r in rows])
 
 @app.route("/api/seasons")
+@cached(CACHE_TTL_SEASONS)
 def get_seasons():
     league = request.args.get("league")
     seasons = fetch_seasons_from_db(league)
     return jsonify(seasons)
 
 @app.route("/api/matches")
+@cached(CACHE_TTL_MATCHES, tag=lambda args: (args.get("league"), int(args.get("season"))))
 def get_matches():
-    limit = int(request.args.get("limit", 300))
+    # Paged with ?cursor=<X-Next-Cursor of the previous response>; ?from= (inclusive) / ?to= (exclusive) ISO dates
     league = request.args.get("league")
     season = request.args.get("season")
     status = request.args.get("status")  # "NS" or "FT" etc.
 
     if not league or not season:
         return jsonify({"error": "league and season are required"}), 400
+    try:
+        season = int(season)
+        limit = int(request.args.get("limit", 300))
+    except ValueError:
+        return jsonify({"error": "season and limit must be integers"}), 400
+    if limit <= 0:
+        return jsonify({"error": "limit must be positive"}), 400
+    limit = min(limit, MATCHES_MAX_LIMIT)
+    try:
+        date_from = datetime.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        date_to = datetime.fromisoformat(request.args["to"]) if request.args.get("to") else None
+    except ValueError:
+        return jsonify({"error": "from / to must be ISO dates"}), 400
+    try:
+        after = _decode_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+    except (ValueError, TypeError, binascii.Error):
+        return jsonify({"error": "invalid cursor"}), 400
 
     upcoming_only = (status == "NS")
 
-    rows = fetch_matches_with_probs(
+    body, next_after = fetch_matches_page(
         league=league,
-        season=int(season),
+        season=season,
         limit=limit,
         upcoming_only=upcoming_only,
+        status=status,  # filtered in SQL, before the LIMIT
+        date_from=date_from,
+        date_to=date_to,
+        after=after,
     )
-    # If status is provided (FT/NS/etc) filter it 
-    if status:
-        rows = [r for r in rows if str(r.get("status")) == status]
+    resp = _json_bytes(body)
+    if next_after is not None:
+        resp.headers["X-Next-Cursor"] = _encode_cursor(next_after)
+    return resp
 
-    return jsonify(_rows_json_safe(rows))
 @app.route("/api/live_predictions")
 def api_live_predictions():
     limit = request.args.get("limit", default=50, type=int)
-    rows = fetch_live_predictions(limit)
-    return jsonify(_rows_json_safe(rows))
+    return _json_bytes(fetch_live_predictions(limit, as_json=True))
+
+@app.route("/api/live_predictions/stream")
+def api_live_predictions_stream():
+    # Server-Sent Events: snapshot of the latest predictions, then each update as it is written
+    limit = request.args.get("limit", default=50, type=int)
+    return Response(
+        stream_events(limit),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/api/live_predictions/history")
+def api_live_predictions_history():
+    limit = request.args.get("limit", default=50, type=int)
+    hours = request.args.get("hours", default=6, type=float)
+    return _json_bytes(fetch_latest_prediction_events(limit, window_hours=hours, as_json=True))
+
+@app.route("/api/live_predictions/<int:fixture_id>/trajectory")
+def api_prediction_trajectory(fixture_id):
+    try:
+        since = datetime.fromisoformat(request.args["since"]) if request.args.get("since") else None
+    except ValueError:
+        return jsonify({"error": "since must be an ISO datetime"}), 400
+    return _json_bytes(fetch_prediction_trajectory(fixture_id, since=since, as_json=True))
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host="127.0.0.1", port=5000)
+    # development server only, production runs gunicorn with gunicorn.conf.py (see Dockerfile)
+    app.run(debug=os.getenv("FLASK_DEBUG", "1") == "1", host="127.0.0.1", port=5000, threaded=True)
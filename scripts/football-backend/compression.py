@@ -0,0 +1,53 @@
+import os
+import gzip
+import threading
+from collections import OrderedDict
+from flask import request
+
+# gzip for JSON responses (after_request hook). Compressed bodies of responses with an ETag are
+# memoized by ETag, so a response served from the response cache is only compressed once.
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))  #smaller bodies aren't worth it
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))  #1 fastest .. 9 smallest
+GZIP_CACHE_ENTRIES = 256
+
+_compressed = OrderedDict()  # etag -> gzipped body
+_lock = threading.Lock()
+
+
+def _gzip_cached(etag: str | None, body: bytes) -> bytes:
+    if etag is None:
+        return gzip.compress(body, GZIP_LEVEL)
+    with _lock:
+        gz = _compressed.get(etag)
+        if gz is not None:
+            _compressed.move_to_end(etag)
+            return gz
+    gz = gzip.compress(body, GZIP_LEVEL)
+    with _lock:
+        _compressed[etag] = gz
+        while len(_compressed) > GZIP_CACHE_ENTRIES:
+            _compressed.popitem(last=False)
+    return gz
+
+
+def gzip_response(response):
+    if (
+        response.status_code != 200
+        or response.is_streamed  #SSE
+        or response.mimetype != "application/json"
+        or "Content-Encoding" in response.headers
+        or request.accept_encodings["gzip"] <= 0
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+
+    etag, _ = response.get_etag()
+    response.set_data(_gzip_cached(etag, body))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    if etag is not None:
+        # same ETag for both encodings, so it has to be weak (If-None-Match compares weakly)
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,30 @@
+import os
+import multiprocessing
+
+# Production serving for the backend: gunicorn -c gunicorn.conf.py app:app
+# gevent workers serve many concurrent requests (and long-lived SSE streams) per process; psycopg2 is
+# made cooperative with psycogreen, so a request waiting on Postgres yields instead of blocking the worker.
+bind = os.getenv("BACKEND_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("BACKEND_WORKERS", str(multiprocessing.cpu_count())))
+worker_class = os.getenv("BACKEND_WORKER_CLASS", "gevent")  #"sync" / "gthread" also work, without the green DB path
+worker_connections = int(os.getenv("BACKEND_WORKER_CONNECTIONS", "1000"))  #concurrent requests per gevent worker
+threads = int(os.getenv("BACKEND_THREADS", "8"))  #only used by the gthread worker
+timeout = int(os.getenv("BACKEND_TIMEOUT", "60"))  #restart a worker stuck this long
+graceful_timeout = int(os.getenv("BACKEND_GRACEFUL_TIMEOUT", "30"))  #on SIGTERM: finish in-flight requests for up to this long
+keepalive = 5
+max_requests = int(os.getenv("BACKEND_MAX_REQUESTS", "0"))  #recycle workers after N requests (0 = never)
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv("BACKEND_ACCESS_LOG") or None  #"-" for stdout
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    server.log.info(f"[BACKEND] worker {worker.pid} started ({worker_class})")
+
+
+def worker_exit(server, worker):
+    # Close this worker's DB pool so Postgres sees the connections go right away
+    from db_pg import close_pool
+    close_pool()
@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import queue
+import threading
+from datetime import datetime, date
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db_pg import fetch_live_predictions, fetch_live_predictions_by_ids
+import pg_listener
+
+# Server-Sent Events fan-out of live predictions.
+# The predictions_live trigger sends the changed fixture ids on live_predictions_changed; the
+# process-wide listener fetches those rows once and pushes the same pre-serialized event to every
+# connected client, so DB load doesn't grow with the number of viewers.
+NOTIFY_CHANNEL = "live_predictions_changed"
+LIVE_STREAM_QUEUE_SIZE = int(os.getenv("LIVE_STREAM_QUEUE_SIZE", "256"))  #pending events per client before it's dropped
+LIVE_STREAM_KEEPALIVE = float(os.getenv("LIVE_STREAM_KEEPALIVE", "15"))  #seconds between comment pings (proxies close idle streams)
+LIVE_STREAM_SNAPSHOT_LIMIT = 50  #latest predictions sent when a client connects
+
+
+def _json_default(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return str(v)
+
+
+def format_event(event: str, row) -> str:
+    return f"event: {event}\ndata: {json.dumps(dict(row), default=_json_default)}\n\n"
+
+
+class Broadcaster:
+    def __init__(self, queue_size: int = LIVE_STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> queue.Queue:
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._clients.add(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        with self._lock:
+            self._clients.discard(q)
+
+    def clients(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def publish(self, message: str) -> None:
+        with self._lock:
+            clients = list(self._clients)
+        for q in clients:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # too slow to keep up: drop it, the browser reconnects and gets a fresh snapshot
+                self.unsubscribe(q)
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait(None)
+
+
+broadcaster = Broadcaster()
+
+
+def on_notify(payload: str) -> None:
+    if not broadcaster.clients():
+        return  #nobody watching, no query
+    try:
+        fixture_ids = [int(x) for x in json.loads(payload or "[]")]
+    except (ValueError, TypeError):
+        fixture_ids = []
+    if fixture_ids:
+        rows = fetch_live_predictions_by_ids(fixture_ids)
+    else:
+        rows = fetch_live_predictions(LIVE_STREAM_SNAPSHOT_LIMIT)
+    for r in rows:
+        broadcaster.publish(format_event("prediction", r))
+
+
+pg_listener.subscribe(NOTIFY_CHANNEL, on_notify)
+
+
+def stream_events(snapshot_limit: int = LIVE_STREAM_SNAPSHOT_LIMIT):
+    """Generator for one SSE client: a snapshot of the latest predictions, then every update."""
+    pg_listener.ensure_listener()
+    q = broadcaster.subscribe()  #before the snapshot, so no update falls in between
+    try:
+        yield "retry: 3000\n\n"
+        for r in fetch_live_predictions(snapshot_limit):
+            yield format_event("prediction", r)
+        while True:
+            try:
+                message = q.get(timeout=LIVE_STREAM_KEEPALIVE)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                return
+            yield message
+    finally:
+        broadcaster.unsubscribe(q)
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import select
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db_pg import get_db_connection
+
+# One Postgres LISTEN connection per backend process, shared by every feature that reacts to
+# NOTIFY (response cache invalidation, live prediction stream). Callbacks run on the listener
+# thread and must be quick; on_reconnect callbacks run after every (re)connect, since
+# notifications sent while disconnected are lost.
+LISTEN_RECONNECT_BACKOFF = 5  #seconds before reconnecting a dropped LISTEN connection
+
+_handlers = {}  # channel -> list of callback(payload)
+_reconnect_handlers = []
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def subscribe(channel: str, callback, on_reconnect=None) -> None:
+    # Register before the first ensure_listener() call (i.e. at import time)
+    _handlers.setdefault(channel, []).append(callback)
+    if on_reconnect is not None:
+        _reconnect_handlers.append(on_reconnect)
+
+
+def _dispatch(channel: str, payload: str) -> None:
+    for callback in _handlers.get(channel, []):
+        try:
+            callback(payload)
+        except Exception as ex:
+            print(f"[PG LISTEN] handler for {channel} failed: {repr(ex)}")
+
+
+def _listen_forever() -> None:
+    while True:
+        conn = None
+        try:
+            conn = get_db_connection()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                for channel in _handlers:
+                    cur.execute(f"LISTEN {channel};")
+            for callback in _reconnect_handlers:
+                callback()
+            print(f"[PG LISTEN] listening on {', '.join(_handlers)}")
+            while True:
+                if select.select([conn], [], [], 60)[0]:
+                    conn.poll()
+                    while conn.notifies:
+                        n = conn.notifies.pop(0)
+                        _dispatch(n.channel, n.payload)
+        except Exception as ex:
+            print(f"[PG LISTEN] listener error, reconnecting in {LISTEN_RECONNECT_BACKOFF}s: {repr(ex)}")
+        finally:
+            if conn is not None:
+                conn.close()
+        time.sleep(LISTEN_RECONNECT_BACKOFF)
+
+
+def ensure_listener() -> None:
+    # One listener thread per process, started lazily (safe with forking servers)
+    global _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid != os.getpid():
+            threading.Thread(target=_listen_forever, name="pg-listener", daemon=True).start()
+            _listener_pid = os.getpid()
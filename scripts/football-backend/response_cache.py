@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import threading
+from functools import wraps
+from collections import OrderedDict
+from flask import Response, request
+
+import pg_listener
+
+# Server-side cache of JSON responses for the read-only endpoints.
+# Entries are keyed on path + normalized query args, expire after a per-endpoint TTL, and are
+# dropped early when Postgres notifies that match_listing rows changed (trigger in init.sql sends
+# the affected [league, season] pairs on the match_listing_changed channel).
+# Every cached response carries an ETag, so clients revalidating with If-None-Match get a 304.
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+NOTIFY_CHANNEL = "match_listing_changed"
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (body, etag, expires_at, tag, X- headers)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.generation = 0  #bumped by every invalidation
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body: bytes, etag: str, ttl: float, tag=None, generation: int | None = None,
+            headers: list | None = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return  #an invalidation arrived while the response was built, it may be stale already
+            self._entries[key] = (body, etag, time.monotonic() + ttl, tag, headers or [])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, match=None) -> int:
+        # match(tag) -> bool selects the entries to drop; None drops everything
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if match is None or match(e[3])]
+            for k in keys:
+                del self._entries[k]
+            self.generation += 1
+            self.invalidated += len(keys)
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "invalidated": self.invalidated}
+
+
+cache = ResponseCache()
+
+
+def _cache_key():
+    args = tuple(sorted((k, v.strip()) for k, v in request.args.items(multi=True) if v.strip()))
+    return request.path, args
+
+
+def cached(ttl: float, tag=None):
+    """
+    Cache a view's 200 JSON responses for `ttl` seconds. tag(args) labels an entry so a
+    notification can invalidate it (see on_notify); untagged entries only expire by TTL.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not RESPONSE_CACHE_ENABLED:
+                return view(*args, **kwargs)
+            pg_listener.ensure_listener()
+            key = _cache_key()
+            entry = cache.get(key)
+            if entry is None:
+                generation = cache.generation
+                resp = view(*args, **kwargs)
+                if not isinstance(resp, Response) or resp.status_code != 200:
+                    return resp
+                resp.add_etag()
+                etag, _ = resp.get_etag()
+                headers = [(k, v) for k, v in resp.headers if k.lower().startswith("x-")]  #e.g. X-Next-Cursor
+                cache.put(key, resp.get_data(), etag, ttl, tag(request.args) if tag else None, generation, headers)
+            else:
+                body, etag, _, _, headers = entry
+                resp = Response(body, mimetype="application/json")
+                resp.set_etag(etag)
+                for k, v in headers:
+                    resp.headers[k] = v
+            resp.headers["Cache-Control"] = "no-cache"  #browser keeps it but revalidates (cheap 304)
+            return resp.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def on_notify(payload: str) -> None:
+    try:
+        pairs = {(league, int(season)) for league, season in json.loads(payload or "[]")}
+    except (ValueError, TypeError):
+        pairs = set()
+    if not pairs:  #deletes / oversized payloads: no detail, drop every tagged entry
+        n = cache.invalidate(lambda tag: tag is not None)
+    else:
+        n = cache.invalidate(lambda tag: tag in pairs)
+    if n:
+        print(f"[RESPONSE CACHE] invalidated {n} entries ({len(pairs) or 'all'} league/season)")
+
+
+def on_reconnect() -> None:
+    # notifications sent while we weren't listening are lost
+    cache.invalidate(lambda tag: tag is not None)
+
+
+pg_listener.subscribe(NOTIFY_CHANNEL, on_notify, on_reconnect)
@@ -0,0 +1,52 @@
+import os
+import time
+
+from api_football_live_helper import get_head_to_head
+from db_pg import get_h2h_cache, put_h2h_cache
+
+# Persistent cache in front of get_head_to_head (table h2h_api_cache).
+# The H2H history of two teams only changes when they play each other, so an entry stays valid
+# until a newer finished meeting shows up in fixtures (or the TTL runs out as a safety net for
+# meetings in competitions we don't store).
+H2H_CACHE_TTL_HOURS = float(os.getenv("H2H_CACHE_TTL_HOURS", "168"))  #7 days
+H2H_CACHE_MAX_ENTRIES = int(os.getenv("H2H_CACHE_MAX_ENTRIES", "50000"))  #team pairs kept, least recently used evicted
+
+stats = {"hits": 0, "misses": 0, "evicted": 0, "api_seconds": 0.0}
+
+
+def _fixture_date(item: dict) -> str:
+    return ((item.get("fixture") or {}).get("date")) or ""
+
+
+def get_head_to_head_cached(headers, team1_id, team2_id, league=None, season=None, last=10, timeout=25):
+    """
+    Same result as get_head_to_head, served from the cache when possible.
+    Returns (fixtures, from_cache). League/season filtered lookups bypass the cache.
+    """
+    if league or season:
+        return get_head_to_head(headers, team1_id, team2_id, league=league, season=season, last=last, timeout=timeout), False
+
+    cached = get_h2h_cache(team1_id, team2_id, last, H2H_CACHE_TTL_HOURS)
+    if cached is not None:
+        stats["hits"] += 1
+        fixtures = cached["response"]
+        if cached["last_n"] > last:
+            #cached with a bigger `last`: keep the most recent meetings only
+            fixtures = sorted(fixtures, key=_fixture_date, reverse=True)[:last]
+        return fixtures, True
+
+    t0 = time.perf_counter()
+    fixtures = get_head_to_head(headers, team1_id, team2_id, last=last, timeout=timeout)
+    stats["api_seconds"] += time.perf_counter() - t0
+    stats["misses"] += 1
+    stats["evicted"] += put_h2h_cache(team1_id, team2_id, last, fixtures, H2H_CACHE_MAX_ENTRIES)
+    return fixtures, False
+
+
+def stats_line() -> str:
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups if lookups else 0.0
+    return (
+        f"[H2H CACHE] hits={stats['hits']} misses={stats['misses']} hit_rate={hit_rate:.0%} "
+        f"evicted={stats['evicted']} api_time={stats['api_seconds']:.1f}s"
+    )
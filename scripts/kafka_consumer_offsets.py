@@ -0,0 +1,100 @@
+import time
+import psycopg2
+from psycopg2 import pool as pg_pool
+from confluent_kafka import TopicPartition, KafkaException
+
+# At-least-once batch handling shared by the consumers.
+# Auto-commit is off: offsets are stored and committed (asynchronously, once per batch) only after
+# the batch's DB writes succeeded. Transient failures rewind the batch and retry it; a batch that
+# fails for any other reason is replayed one message at a time and the messages that still fail
+# go to a dead-letter topic, so one bad message can't stall a partition.
+CONSUMER_CONFIG = {
+    "enable.auto.commit": False,
+    "enable.auto.offset.store": False,
+}
+RETRY_BACKOFF = 2.0  #seconds before re-reading a batch after a transient failure
+
+# DB/broker hiccups: retry the same messages instead of dead-lettering them
+TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, pg_pool.PoolError, BufferError, KafkaException)
+
+
+def _valid(msgs):
+    return [m for m in msgs if m.error() is None]
+
+
+def next_offsets(msgs) -> list[TopicPartition]:
+    # Offset to resume from per partition (last processed offset + 1)
+    last = {}
+    for m in _valid(msgs):
+        key = (m.topic(), m.partition())
+        last[key] = max(last.get(key, -1), m.offset())
+    return [TopicPartition(t, p, off + 1) for (t, p), off in last.items()]
+
+
+def commit_processed(consumer, msgs) -> None:
+    offsets = next_offsets(msgs)
+    if not offsets:
+        return
+    consumer.store_offsets(offsets=offsets)
+    consumer.commit(asynchronous=True)
+
+
+def rewind(consumer, msgs) -> None:
+    # Seek every partition back to its first message in msgs so the next consume() re-reads them
+    first = {}
+    for m in _valid(msgs):
+        key = (m.topic(), m.partition())
+        first[key] = min(first.get(key, m.offset()), m.offset())
+    for (t, p), off in first.items():
+        try:
+            consumer.seek(TopicPartition(t, p, off))
+        except KafkaException as ex:
+            print(f"[OFFSETS] seek {t}[{p}]@{off} failed (partition revoked?): {ex}")
+
+
+def send_to_dead_letter(producer, dlq_topic: str, msg, reason: str) -> None:
+    headers = [
+        ("source_topic", msg.topic().encode("utf-8")),
+        ("source_partition", str(msg.partition()).encode("utf-8")),
+        ("source_offset", str(msg.offset()).encode("utf-8")),
+        ("error", reason[:500].encode("utf-8")),
+    ]
+    producer.produce(dlq_topic, msg.value(), key=msg.key(), headers=headers)
+    print(f"[DLQ] {msg.topic()}[{msg.partition()}]@{msg.offset()} -> {dlq_topic}: {reason}")
+
+
+def handle_batch(consumer, producer, msgs, process, dlq_topic: str) -> bool:
+    """
+    Run process(msgs) and commit the batch. Returns False when the batch was rewound for a retry.
+    """
+    try:
+        process(msgs)
+        commit_processed(consumer, msgs)
+        return True
+    except TRANSIENT_ERRORS as ex:
+        print(f"[OFFSETS] transient failure, retrying batch of {len(msgs)} in {RETRY_BACKOFF}s: {repr(ex)}")
+        rewind(consumer, msgs)
+        time.sleep(RETRY_BACKOFF)
+        return False
+    except Exception as ex:
+        print(f"[OFFSETS] batch failed ({repr(ex)}), replaying {len(msgs)} messages one by one")
+
+    for i, msg in enumerate(msgs):
+        if msg.error() is not None:
+            continue
+        try:
+            process([msg])
+        except TRANSIENT_ERRORS as ex:
+            print(f"[OFFSETS] transient failure during replay, retrying from offset {msg.offset()}: {repr(ex)}")
+            commit_processed(consumer, msgs[:i])
+            rewind(consumer, msgs[i:])
+            time.sleep(RETRY_BACKOFF)
+            return False
+        except Exception as ex:
+            send_to_dead_letter(producer, dlq_topic, msg, repr(ex))
+    if producer.flush(10):  #dead letters must be on the broker before their offsets are committed
+        print("[OFFSETS] dead letters not delivered yet, retrying batch")
+        rewind(consumer, msgs)
+        return False
+    commit_processed(consumer, msgs)
+    return True
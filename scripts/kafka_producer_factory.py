@@ -0,0 +1,101 @@
+import os
+import threading
+from collections import deque
+from confluent_kafka import Producer
+
+from event_codec import encode_event
+
+# Shared Kafka producer setup for every producer in this project.
+# Messages are keyed by fixture_id (same fixture -> same partition, so per-fixture order is kept
+# however many partitions a topic has), batched with a small linger, compressed, and confirmed
+# through delivery callbacks instead of a synchronous flush after every message.
+BROKER = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "20"))  #wait up to this long to fill a batch
+KAFKA_BATCH_BYTES = int(os.getenv("KAFKA_BATCH_BYTES", str(256 * 1024)))  #max bytes per partition batch
+KAFKA_COMPRESSION = os.getenv("KAFKA_COMPRESSION", "lz4")  #none | gzip | snappy | lz4 | zstd
+LATENCY_WINDOW = 10000  #delivery latencies kept for the percentiles
+
+
+class KeyedProducer:
+    def __init__(self, config: dict, client_id: str):
+        self.client_id = client_id
+        self._producer = Producer(config)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)  # seconds from produce() to broker ack (librdkafka's own)
+        self.delivered = 0
+        self.failed = 0
+
+    def _on_delivery(self, err, msg):
+        # msg.latency() is measured by librdkafka up to the ack, not up to when poll()/flush() served
+        # this callback (the producers sleep between cycles, so that would mostly time the sleep)
+        latency = msg.latency() if err is None else None
+        with self._lock:
+            if err is not None:
+                self.failed += 1
+            else:
+                self.delivered += 1
+                if latency is not None:
+                    self._latencies.append(latency)
+        if err is not None:
+            print(f"[KAFKA] delivery failed topic={msg.topic()} key={msg.key()} err={err}")
+
+    def produce(self, topic: str, value: bytes, key=None, headers: list | None = None) -> None:
+        # Retries once after serving callbacks if the local queue is full
+        callback = self._on_delivery
+        if key is not None and not isinstance(key, bytes):
+            key = str(key).encode("utf-8")
+        try:
+            self._producer.produce(topic, value=value, key=key, headers=headers, on_delivery=callback)
+        except BufferError:
+            self._producer.poll(0.5)
+            self._producer.produce(topic, value=value, key=key, headers=headers, on_delivery=callback)
+        self._producer.poll(0)
+
+    def produce_event(self, topic: str, event: dict, key=None) -> None:
+        """Serialize an event dict (event_codec) and produce it, keyed by its fixture_id unless a key is given."""
+        if key is None:
+            key = event.get("fixture_id")
+        self.produce(topic, encode_event(topic, event), key=key)
+
+    def poll(self, timeout: float = 0) -> int:
+        return self._producer.poll(timeout)
+
+    def flush(self, timeout: float = 30) -> int:
+        return self._producer.flush(timeout)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            delivered, failed = self.delivered, self.failed
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else None
+        return {
+            "delivered": delivered,
+            "failed": failed,
+            "in_flight": len(self._producer),
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p95": pct(0.95),
+            "latency_ms_max": latencies[-1] * 1000 if latencies else None,
+        }
+
+    def stats_line(self) -> str:
+        m = self.metrics()
+        fmt = lambda v: "-" if v is None else f"{v:.0f}ms"
+        return (
+            f"[KAFKA {self.client_id}] delivered={m['delivered']} failed={m['failed']} in_flight={m['in_flight']} "
+            f"p50={fmt(m['latency_ms_p50'])} p95={fmt(m['latency_ms_p95'])} max={fmt(m['latency_ms_max'])}"
+        )
+
+
+def make_producer(client_id: str, broker: str | None = None, **overrides) -> KeyedProducer:
+    config = {
+        "bootstrap.servers": broker or BROKER,
+        "client.id": client_id,
+        "linger.ms": KAFKA_LINGER_MS,
+        "batch.size": KAFKA_BATCH_BYTES,
+        "compression.type": KAFKA_COMPRESSION,
+        "enable.idempotence": True,  #retries can't reorder or duplicate messages of a partition
+        "acks": "all",
+    }
+    config.update(overrides)
+    return KeyedProducer(config, client_id)
@@ -1,3 +1,4 @@
+import os, sys
 import pandas as pd
 from pathlib import Path
 import joblib
@@ -10,6 +11,10 @@ from sklearn.metrics import (
     classification_report,
     confusion_matrix,
 )
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from model.logreg_numpy import fuse_scaler_into_logreg, softmax_proba, save_fused_npz
+from model.model_registry import publish_model
+from data.storage import read_table, write_table
 
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
@@ -19,11 +24,12 @@ FEATURES_CSV = DATA_DIR / "All_matches_features.csv"
 OUTPUT_CSV   = DATA_DIR / "matches_with_probs.csv"
 MODEL_PATH   = DATA_DIR / "Logreg_model.pkl"           
 SCALER_PATH  = DATA_DIR / "Scaler.pkl"
+FUSED_PATH   = DATA_DIR / "Logreg_model.npz"         # dependency-free weights for the live predictor
 
 
 def main():
     print("Loading features:", FEATURES_CSV)
-    df = pd.read_csv(FEATURES_CSV)
+    df = read_table(FEATURES_CSV)
     print("ROOT_DIR:", ROOT_DIR)
     print("DATA_DIR:", DATA_DIR)
     print("FEATURES_CSV:", FEATURES_CSV)
@@ -92,17 +98,29 @@ def main():
     print("\nSaved model to:", MODEL_PATH)
     print("Saved scaler to:", SCALER_PATH)
 
+    # scaler folded into the weights, loaded by the live predictor without sklearn
+    weights, bias, classes = fuse_scaler_into_logreg(model, scaler)
+    save_fused_npz(FUSED_PATH, weights, bias, classes, feature_cols)
+    print("Saved fused weights to:", FUSED_PATH)
+
+    # publish a new version to the registry, the live consumer picks it up without a restart
+    version = publish_model(
+        weights, bias, classes, feature_cols,
+        metrics={"accuracy": float(acc), "macro_f1": float(f1), "train_rows": int(len(X_train))},
+    )
+    print("Published model version:", version)
+
     #  Compute probabilities for ALL rows and save to CSV 
-    X_all_scaled = scaler.transform(X)
-    proba = model.predict_proba(X_all_scaled)
-    class_order = model.classes_.tolist()  # should be [0, 1, 2]
+    # same fused numpy path the live predictor uses
+    proba = softmax_proba(X, weights, bias)
+    class_order = classes.tolist()  # should be [0, 1, 2]
 
     df["prob_away_win"] = proba[:, class_order.index(0)]
     df["prob_draw"] = proba[:, class_order.index(1)]
     df["prob_home_win"] = proba[:, class_order.index(2)]
 
-    print("\nSaving matches with probabilities to:", OUTPUT_CSV)
-    df.to_csv(OUTPUT_CSV, index=False)
+    saved_to = write_table(df, OUTPUT_CSV)
+    print("\nSaved matches with probabilities to:", saved_to)
     print("Done.")
 
 
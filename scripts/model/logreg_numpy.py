@@ -0,0 +1,53 @@
+import numpy as np
+
+# Pure numpy inference for the StandardScaler + multinomial LogisticRegression pipeline.
+# The scaler is folded into the coefficients, so scoring N rows is one matmul + softmax:
+#   z = ((x - mean) / scale) @ coef.T + intercept
+#     = x @ (coef / scale).T + (intercept - coef @ (mean / scale))
+
+
+def fuse_scaler_into_logreg(model, scaler):
+    """Return (weights (n_classes, n_features), bias (n_classes,), classes) for a fitted model/scaler pair."""
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+
+    mean = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+    mean = np.zeros(coef.shape[1]) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(coef.shape[1]) if scale is None else np.asarray(scale, dtype=np.float64)
+
+    weights = coef / scale
+    bias = intercept - coef @ (mean / scale)
+    classes = np.asarray(model.classes_).astype(int)
+    return weights, bias, classes
+
+
+def softmax_proba(x, weights, bias):
+    """Class probabilities for every row of x, shape (n_rows, n_classes)."""
+    z = np.asarray(x, dtype=np.float64) @ weights.T + bias
+    z -= z.max(axis=1, keepdims=True)  # numerical stability
+    np.exp(z, out=z)
+    z /= z.sum(axis=1, keepdims=True)
+    return z
+
+
+def save_fused_npz(path, weights, bias, classes, feature_cols):
+    # Tiny dependency-free artifact for the live predictor (no sklearn/joblib needed to load it)
+    np.savez(
+        path,
+        weights=np.asarray(weights, dtype=np.float64),
+        bias=np.asarray(bias, dtype=np.float64),
+        classes=np.asarray(classes, dtype=np.int64),
+        feature_cols=np.asarray(feature_cols, dtype=str),
+    )
+
+
+def load_fused_npz(path):
+    """Return (weights, bias, classes, feature_cols) saved by save_fused_npz."""
+    with np.load(path, allow_pickle=False) as data:
+        return (
+            data["weights"],
+            data["bias"],
+            data["classes"].astype(int),
+            [str(c) for c in data["feature_cols"]],
+        )
@@ -0,0 +1,109 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .logreg_numpy import save_fused_npz, load_fused_npz
+
+# Versioned model artifacts:
+#   model_registry/
+#     CURRENT                      <- name of the active version (swapped atomically)
+#     20250301T120000Z/
+#       Logreg_model.npz
+#       manifest.json              <- feature columns, class order, sha256 of every file, metrics
+BASE_DIR = Path(__file__).resolve().parent
+REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", BASE_DIR.parent / "data_api_football" / "model_registry"))
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+WEIGHTS_FILE = "Logreg_model.npz"
+
+
+class ModelRegistryError(Exception):
+    pass
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def publish_model(weights, bias, classes, feature_cols, metrics: dict | None = None,
+                  version: str | None = None, registry_dir: Path = REGISTRY_DIR, activate: bool = True) -> str:
+    """Write a new model version (weights + manifest) and, by default, make it the active one."""
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    registry_dir = Path(registry_dir)
+    final_dir = registry_dir / version
+    if final_dir.exists():
+        raise ModelRegistryError(f"model version {version} already exists in {registry_dir}")
+
+    # build the version in a temp dir, then rename it into place so readers never see half a version
+    tmp_dir = registry_dir / f".{version}.tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    save_fused_npz(tmp_dir / WEIGHTS_FILE, weights, bias, classes, feature_cols)
+
+    manifest = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "feature_cols": list(feature_cols),
+        "classes": [int(c) for c in classes],
+        "files": {WEIGHTS_FILE: _sha256(tmp_dir / WEIGHTS_FILE)},
+        "metrics": metrics or {},
+    }
+    _atomic_write_text(tmp_dir / MANIFEST_FILE, json.dumps(manifest, indent=2))
+    os.replace(tmp_dir, final_dir)
+
+    if activate:
+        activate_version(version, registry_dir)
+    return version
+
+
+def activate_version(version: str, registry_dir: Path = REGISTRY_DIR) -> None:
+    registry_dir = Path(registry_dir)
+    if not (registry_dir / version / MANIFEST_FILE).exists():
+        raise ModelRegistryError(f"unknown model version {version} in {registry_dir}")
+    _atomic_write_text(registry_dir / CURRENT_FILE, version + "\n")
+
+
+def current_version(registry_dir: Path = REGISTRY_DIR) -> str | None:
+    try:
+        version = (Path(registry_dir) / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def load_version(version: str, expected_feature_cols: list[str] | None = None, registry_dir: Path = REGISTRY_DIR):
+    """Verify checksums/manifest of a version and return (weights, bias, classes, manifest)."""
+    version_dir = Path(registry_dir) / version
+    try:
+        manifest = json.loads((version_dir / MANIFEST_FILE).read_text())
+    except FileNotFoundError:
+        raise ModelRegistryError(f"missing manifest for model version {version}")
+
+    for name, checksum in manifest.get("files", {}).items():
+        actual = _sha256(version_dir / name)
+        if actual != checksum:
+            raise ModelRegistryError(f"checksum mismatch for {version}/{name}")
+
+    weights, bias, classes, cols = load_fused_npz(version_dir / WEIGHTS_FILE)
+    if cols != manifest["feature_cols"] or [int(c) for c in classes] != manifest["classes"]:
+        raise ModelRegistryError(f"weights of {version} do not match its manifest")
+    if expected_feature_cols is not None and cols != list(expected_feature_cols):
+        raise ModelRegistryError(f"model {version} expects features {cols}, predictor sends {expected_feature_cols}")
+    if sorted(int(c) for c in classes) != [0, 1, 2]:
+        raise ModelRegistryError(f"model {version} has unexpected classes {list(classes)}")
+
+    return weights, bias, classes, manifest
@@ -1,4 +1,4 @@
-from ..db_pg import get_db_connection, insert_prematch_prediction
+from ..db_pg import db_connection, insert_prematch_prediction
 DEFAULT = {"prob_home_win": 1/3, "prob_draw": 1/3, "prob_away_win": 1/3}
 
 def h2h_probs(n, hw, d, aw):
@@ -29,14 +29,11 @@ def main(limit=5000):
     LIMIT %s;
     """
 
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
+    with db_connection() as conn:
+        with conn, conn.cursor() as cur:
             cur.execute(sql, (limit,))
             rows = cur.fetchall()
             cols = [d[0] for d in cur.description]
-    finally:
-        conn.close()
 
     for r in rows:
         row = dict(zip(cols, r))
@@ -1,11 +1,18 @@
-import joblib
+import os
+import time
+import threading
+from typing import NamedTuple
 import numpy as np
 from pathlib import Path
 
+from . import model_registry
+from .logreg_numpy import fuse_scaler_into_logreg, softmax_proba, load_fused_npz
+
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR.parent / "data_api_football"
 MODEL_PATH = DATA_DIR / "Logreg_model.pkl"
 SCALER_PATH = DATA_DIR / "Scaler.pkl"
+FUSED_PATH = DATA_DIR / "Logreg_model.npz"  # exported by baseline_model.py
 
 FEATURE_COLS = [
     "diff_goals",
@@ -17,32 +24,168 @@ FEATURE_COLS = [
     "diff_fouls",
 ]
 
-# Load model and scaler once (at import time)
-# print("Loading model from:", MODEL_PATH)
-model = joblib.load(MODEL_PATH)
-# print("MODEL CLASSES:", model.classes_)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))  #seconds between registry checks
+
+
+class LoadedModel(NamedTuple):
+    weights: np.ndarray
+    bias: np.ndarray
+    outcome_idx: list[int]
+    version: str
+
+
+# Artifacts are loaded lazily on first prediction so importing this module stays cheap
+# (no sklearn/joblib import, no unpickling) and the consumer can start fast.
+_lock = threading.RLock()
+_fused = None    # LoadedModel, swapped as a whole on hot reload
+_sklearn = None  # (model, scaler), only for the fused=False reference path
+_last_reload_check = 0.0
+_rejected_version = None  # last registry version that failed validation, not retried
+
+
+def _outcome_idx(classes) -> list[int]:
+    # Column index of away win (0), draw (1), home win (2) in the probability matrix
+    classes = np.asarray(classes)
+    return [int(np.flatnonzero(classes == lbl)[0]) for lbl in (0, 1, 2)]
+
+
+def get_sklearn_model():
+    """Return (model, scaler) unpickled from MODEL_PATH / SCALER_PATH."""
+    global _sklearn
+    if _sklearn is None:
+        with _lock:
+            if _sklearn is None:
+                import joblib
+                _sklearn = (joblib.load(MODEL_PATH), joblib.load(SCALER_PATH))
+    return _sklearn
+
+
+def _load_registry_version(version: str) -> LoadedModel:
+    weights, bias, classes, _ = model_registry.load_version(version, expected_feature_cols=FEATURE_COLS)
+    return LoadedModel(weights, bias, _outcome_idx(classes), version)
+
+
+def _load_bundled() -> LoadedModel:
+    if FUSED_PATH.exists():
+        weights, bias, classes, cols = load_fused_npz(FUSED_PATH)
+        if cols != FEATURE_COLS:
+            raise ValueError(f"{FUSED_PATH} feature columns {cols} do not match {FEATURE_COLS}")
+        return LoadedModel(weights, bias, _outcome_idx(classes), FUSED_PATH.name)
+    model, scaler = get_sklearn_model()
+    weights, bias, classes = fuse_scaler_into_logreg(model, scaler)
+    return LoadedModel(weights, bias, _outcome_idx(classes), MODEL_PATH.name)
 
 
-# print("Loading scaler from:", SCALER_PATH)
-scaler = joblib.load(SCALER_PATH)
+def load_model() -> LoadedModel:
+    """
+    Return the active model, loading it on first use from (in order):
+    the registry's CURRENT version, the bundled .npz, the pickles.
+    A registry version that fails to load or validate is logged and skipped, so one bad
+    publish can't crash-loop the consumers; maybe_reload_model picks up the next good one.
+    """
+    global _fused, _rejected_version
+    if _fused is not None:
+        return _fused
+
+    with _lock:
+        if _fused is None:
+            t0 = time.perf_counter()
+            loaded = None
+            version = None
+            try:
+                version = model_registry.current_version()
+                if version is not None:
+                    loaded = _load_registry_version(version)
+            except Exception as ex:
+                _rejected_version = version
+                print(f"[MODEL] registry version {version} failed to load, using the bundled model: {ex!r}")
+            if loaded is None:
+                loaded = _load_bundled()
+            _fused = loaded
+            print(f"[MODEL] loaded {loaded.version} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    return _fused
+
+
+def maybe_reload_model(force: bool = False) -> bool:
+    """
+    Swap in the registry's CURRENT version if it changed (checked at most every
+    MODEL_RELOAD_INTERVAL seconds). Callers that grabbed the previous LoadedModel
+    keep scoring with it, so in-flight batches are never mixed across versions.
+    A version that fails validation is logged and the current model is kept.
+    """
+    global _fused, _last_reload_check, _rejected_version
+    now = time.monotonic()
+    if not force and now - _last_reload_check < MODEL_RELOAD_INTERVAL:
+        return False
+    _last_reload_check = now
+
+    try:
+        version = model_registry.current_version()
+    except Exception as ex:
+        print(f"[MODEL] registry check failed, keeping {_fused.version if _fused else None}: {ex!r}")
+        return False
+    if version is None or version == _rejected_version or (_fused is not None and _fused.version == version):
+        return False
+
+    with _lock:
+        try:
+            loaded = _load_registry_version(version)
+        except Exception as ex:
+            _rejected_version = version
+            print(f"[MODEL] reload of {version} failed, keeping {_fused.version if _fused else None}: {ex!r}")
+            return False
+        previous = _fused.version if _fused else None
+        _fused = loaded
+    print(f"[MODEL] hot-reloaded {previous} -> {version}")
+    return True
+
+
+def to_feature_matrix(rows) -> np.ndarray:
+    # Accept a list of diff dicts or anything array-like of shape (n, len(FEATURE_COLS))
+    if isinstance(rows, np.ndarray):
+        x = rows.astype(np.float64, copy=False)
+    elif len(rows) and isinstance(rows[0], dict):
+        x = np.array([[row[col] for col in FEATURE_COLS] for row in rows], dtype=np.float64)
+    else:
+        x = np.asarray(rows, dtype=np.float64)
+
+    x = x.reshape(-1, len(FEATURE_COLS)) if x.size else np.empty((0, len(FEATURE_COLS)))
+    return x
+
+
+def predict_proba_matrix(rows, fused: bool = True, model: LoadedModel | None = None) -> np.ndarray:
+    """
+    Probabilities for all rows in one pass, shape (n, 3) with columns
+    [away_win, draw, home_win].
+    fused=True uses the numpy softmax over the folded scaler/model weights
+    (`model` pins a specific LoadedModel, default is the active one),
+    fused=False goes through sklearn (reference path).
+    """
+    x = to_feature_matrix(rows)
+    if not len(x):
+        return np.empty((0, 3))
+
+    if fused:
+        weights, bias, outcome_idx, _ = model or load_model()
+        proba = softmax_proba(x, weights, bias)
+    else:
+        sk_model, scaler = get_sklearn_model()
+        proba = sk_model.predict_proba(scaler.transform(x))
+        outcome_idx = _outcome_idx(sk_model.classes_)
+    return proba[:, outcome_idx]
 
 
 def predict_match_probs(diff_features: dict):
-    
-    # Put values into correct order and shape (1, n_features)
-    x = np.array([[diff_features[col] for col in FEATURE_COLS]])
-    x_scaled = scaler.transform(x)
-
-    proba = model.predict_proba(x_scaled)[0]  # shape (3,)
-    classes = model.classes_                 # e.g. array([0., 1., 2.])
-
-    # Build {label: probability}
-    proba_by_label = {int(lbl): float(p) for lbl, p in zip(classes, proba)}
-    return {
-        "away_win": proba_by_label[0],
-        "draw": proba_by_label[1],
-        "home_win": proba_by_label[2],
-    }
+    return predict_match_probs_batch([diff_features])[0]
+
+
+def predict_match_probs_batch(rows, fused: bool = True, model: LoadedModel | None = None) -> list[dict]:
+    # Same output format as predict_match_probs, one dict per input row
+    proba = predict_proba_matrix(rows, fused=fused, model=model)
+    return [
+        {"away_win": away, "draw": draw, "home_win": home}
+        for away, draw, home in proba.tolist()
+    ]
 
 # if __name__ == "__main__":
 #     # sample = {
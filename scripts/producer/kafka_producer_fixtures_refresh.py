@@ -1,11 +1,10 @@
-import json
-from confluent_kafka import Producer
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from apiCallsToCSVFiles.fetch_stats_matches import HEADERS
 from scripts.api_football_live_helper import get_fixtures_by_league_season
+from kafka_producer_factory import make_producer
 
 BROKER = "localhost:9092"
 TOPIC = "fixtures_refresh"
@@ -13,7 +12,7 @@ LEAGUE_IDS = [39, 140, 78, 135, 61]  #Premier League, La Liga, Bundesliga, Serie
 SEASON  = 2025
 
 def main():
-    producer = Producer({'bootstrap.servers': BROKER})
+    producer = make_producer("fixtures_refresh", BROKER)
 
     total = 0
     for league_id in LEAGUE_IDS:
@@ -46,12 +45,13 @@ def main():
                 "away_goals": goals.get("away"),
             }
 
-            producer.produce(TOPIC, value=json.dumps(event).encode("utf-8"))
+            producer.produce_event(TOPIC, event)
             total += 1
 
-        producer.flush() #ensure all messages for this league are sent
         print(f"  Published {len(items)} fixtures to Kafka topic '{TOPIC}'")
 
+    producer.flush() #ensure all messages are sent before exiting
+    print(producer.stats_line())
     print(f"\nDONE. Total fixtures published: {total}")
 
 if __name__ == "__main__":
@@ -1,13 +1,16 @@
 import json
 import time
-from confluent_kafka import Producer
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
-from apiCallsToCSVFiles.fetch_stats_matches import fetch_fixture_stats, BASE_URL, HEADERS
+from apiCallsToCSVFiles.fetch_stats_matches import BASE_URL, HEADERS
 from api_football_live_helper import get_live_fixtures
+from api_football_client import stats_line
+from kafka_producer_factory import make_producer
+from stats_fetcher import fetch_stats_concurrently
+from poll_scheduler import PollScheduler, idle_sleep_seconds
 
 
 BROKER = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
@@ -15,8 +18,7 @@ TOPIC = "match_stats_raw"
 
 IN_PLAY = {"1H","HT","2H","ET","BT","P","SUSP","INT","LIVE"} #statuses indicating match is live/in-play
 
-POLL_LIVE_FIXTURES_INTERVAL = 10  #seconds between polling live fixtures
-SLEEP_BETWEEN_FIXTURE_STATS = 0.15  #seconds between fetching stats for different fixtures
+POLL_LIVE_FIXTURES_INTERVAL = 10  #max seconds between polling live fixtures while matches are in play
 PUBLISH_DEDUP = True  #whether to deduplicate published events to Kafka
 
 LEAGUE_IDS = {
@@ -42,8 +44,9 @@ def make_signature(e: dict) -> str:
     return "|".join(str(e.get(k)) for k in keys)
 
 def main():
-    p = Producer({'bootstrap.servers': BROKER})
+    p = make_producer("live_stats", BROKER)
     last_signature_by_fixture = {}
+    scheduler = PollScheduler()
 
     while True:
         print("\nPolling live fixtures")
@@ -79,19 +82,25 @@ def main():
             })
         # No live matches
         if not in_play:
-            print(" No live/in-play matches found.")
-            time.sleep(POLL_LIVE_FIXTURES_INTERVAL)
+            scheduler.due([])  #forget finished fixtures
+            last_signature_by_fixture.clear()
+            # the league filter above is off, so the live=all feed can start a match we have no fixture for
+            delay = idle_sleep_seconds(POLL_LIVE_FIXTURES_INTERVAL, live_all=True)
+            print(f" No live/in-play matches found. Next poll in {delay:.0f}s.")
+            time.sleep(delay)
             continue # skip to next 
 
-        print(f" Found {len(in_play)} live/in-play matches.")
+        due = scheduler.due(in_play)
+        print(f" Found {len(in_play)} live/in-play matches, {len(due)} due for stats.")
 
-        for f in in_play:
+        t0 = time.perf_counter()
+        published = 0
+        for f, stats in fetch_stats_concurrently(due):
             fixture_id = f["fixture_id"]
-            print(f"  Fetching stats for fixture_id={fixture_id}...")
-            stats = fetch_fixture_stats(fixture_id, f["home_team"], f["away_team"])
+            scheduler.mark_polled(f)
 
             if not stats:
-                print("   [WARNING] No stats found.")
+                print(f"   [WARNING] No stats found for fixture_id={fixture_id}.")
                 continue
 
             event = {"mode": "live", "fixture_id": fixture_id, **f, **stats}
@@ -100,15 +109,18 @@ def main():
             if PUBLISH_DEDUP:
                 last_sig = last_signature_by_fixture.get(fixture_id)
                 if last_sig == signature:
-                    print("   No changes in stats. Skipping publish.")
                     continue
                 last_signature_by_fixture[fixture_id] = signature
 
-            p.produce(TOPIC, value=json.dumps(event).encode("utf-8"))
-            p.flush()
-            print("   Published stats to Kafka.")
+            p.produce_event(TOPIC, event)
+            published += 1
 
-            time.sleep(SLEEP_BETWEEN_FIXTURE_STATS)
+        p.poll(0)
+        if due:
+            print(f" Stats cycle: fixtures={len(due)} published={published} took={time.perf_counter() - t0:.2f}s")
+            print(stats_line())
+            print(p.stats_line())
+        time.sleep(scheduler.sleep_hint(POLL_LIVE_FIXTURES_INTERVAL))
 
 
 if __name__ == "__main__":
@@ -1,10 +1,9 @@
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import json
 import time 
-from confluent_kafka import Producer
 from db_pg import fetch_fixtures_h2h
+from kafka_producer_factory import make_producer
 
 BROKER = "localhost:9092" 
 TOPIC = "prematch_h2h"
@@ -12,11 +11,10 @@ TOPIC = "prematch_h2h"
 LIMIT = 5000  #max fixtures to fetch per run
 STALE_HOURS = 12  #only fetch fixtures with h2h data older than this
 POLL_INTERVAL = 60  #seconds between polling for new fixtures
-SLEEP_BETWEEN_FIXTURES = 0.01  #seconds between publishing different fixtures
 
 
 def main():
-    p = Producer({"bootstrap.servers": BROKER})
+    p = make_producer("prematch_h2h", BROKER)
 
     while True:
         rows = fetch_fixtures_h2h(limit=LIMIT, stale_hours=STALE_HOURS)
@@ -43,15 +41,12 @@ def main():
                 "date": dt.isoformat() if dt else None,
             }
 
-            p.produce(TOPIC, value=json.dumps(event).encode("utf-8"))
+            p.produce_event(TOPIC, event)
             sent += 1
 
-            # small throttle
-            if SLEEP_BETWEEN_FIXTURES:
-                time.sleep(SLEEP_BETWEEN_FIXTURES)
-
-        p.flush()
+        p.poll(0)
         print(f"[PREMATCH PRODUCER] published {sent} messages to topic={TOPIC}")
+        print(p.stats_line())
 
         time.sleep(POLL_INTERVAL)
 
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+from datetime import datetime, timezone
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db_pg import fetch_next_kickoff
+
+# Per-fixture polling cadence for the live stats producer.
+# Stats are only requested when a fixture is due: never during breaks, faster late in the second
+# half / extra time, immediately after the score changes. When nothing is in play the producer
+# sleeps until shortly before the next kickoff known in the fixtures table.
+POLL_STATS_INTERVAL = float(os.getenv("POLL_STATS_INTERVAL", "45"))  #seconds between stats polls of a running match
+POLL_STATS_LATE_INTERVAL = float(os.getenv("POLL_STATS_LATE_INTERVAL", "20"))  #from LATE_MINUTE on and in extra time
+LATE_MINUTE = int(os.getenv("POLL_LATE_MINUTE", "75"))
+KICKOFF_LEAD_SECONDS = float(os.getenv("POLL_KICKOFF_LEAD_SECONDS", "60"))  #wake up this long before a kickoff
+IDLE_MAX_SLEEP = float(os.getenv("POLL_IDLE_MAX_SLEEP", "900"))  #longest sleep with nothing live
+# live=all also carries leagues that aren't in our fixtures table, whose kickoffs we can't see coming
+IDLE_LIVE_ALL_MAX_SLEEP = float(os.getenv("POLL_IDLE_LIVE_ALL_MAX_SLEEP", "120"))
+KICKOFF_GRACE_MINUTES = 150  #NS fixtures this late are still treated as "about to start" (delays, stale status)
+
+BREAK_STATUSES = {"HT", "BT", "INT", "SUSP"}  #stats don't move: half-time, break before extra time, interrupted, suspended
+
+
+def stats_interval(status_short: str | None, elapsed: int | None) -> float | None:
+    """Seconds between stats polls for a fixture in this state, None to skip it."""
+    if status_short in BREAK_STATUSES:
+        return None
+    if status_short in ("ET", "P"):
+        return POLL_STATS_LATE_INTERVAL
+    if status_short == "2H" and (elapsed or 0) >= LATE_MINUTE:
+        return POLL_STATS_LATE_INTERVAL
+    return POLL_STATS_INTERVAL
+
+
+class PollScheduler:
+    def __init__(self):
+        self.next_due = {}  # fixture_id -> monotonic time of the next stats poll
+        self.last_score = {}  # fixture_id -> (home_goals, away_goals) at the last poll
+
+    def due(self, in_play: list[dict], now: float | None = None) -> list[dict]:
+        """Fixtures from the live feed whose stats should be fetched now."""
+        now = time.monotonic() if now is None else now
+        live_ids = {f["fixture_id"] for f in in_play}
+        for fixture_id in list(self.next_due):
+            if fixture_id not in live_ids:  #finished / left the live feed
+                self.next_due.pop(fixture_id, None)
+                self.last_score.pop(fixture_id, None)
+
+        due = []
+        for f in in_play:
+            fixture_id = f["fixture_id"]
+            if stats_interval(f.get("status_short"), f.get("elapsed")) is None:
+                # on a break: drop its (now past) due time, or sleep_hint would keep the live-feed
+                # poll at 1 s for the whole break; stats are fetched right away when play resumes
+                self.next_due.pop(fixture_id, None)
+                continue
+            score = (f.get("home_goals"), f.get("away_goals"))
+            scored = fixture_id in self.last_score and self.last_score[fixture_id] != score
+            if scored or now >= self.next_due.get(fixture_id, 0.0):
+                due.append(f)
+        return due
+
+    def mark_polled(self, f: dict, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        interval = stats_interval(f.get("status_short"), f.get("elapsed"))
+        self.next_due[f["fixture_id"]] = now + (interval or POLL_STATS_INTERVAL)
+        self.last_score[f["fixture_id"]] = (f.get("home_goals"), f.get("away_goals"))
+
+    def sleep_hint(self, max_sleep: float, now: float | None = None) -> float:
+        # Next live-feed poll: when the earliest fixture is due, but at least every max_sleep seconds
+        now = time.monotonic() if now is None else now
+        if not self.next_due:
+            return max_sleep
+        return min(max_sleep, max(1.0, min(self.next_due.values()) - now))
+
+
+def idle_sleep_seconds(min_sleep: float, live_all: bool = True) -> float:
+    """
+    Nothing in play: sleep until KICKOFF_LEAD_SECONDS before the next known kickoff.
+    live_all=True (the feed isn't filtered to our leagues) caps the sleep at IDLE_LIVE_ALL_MAX_SLEEP,
+    so matches of other leagues are still picked up soon after they start.
+    """
+    max_sleep = min(IDLE_MAX_SLEEP, IDLE_LIVE_ALL_MAX_SLEEP) if live_all else IDLE_MAX_SLEEP
+    try:
+        kickoff = fetch_next_kickoff(KICKOFF_GRACE_MINUTES)
+    except Exception as ex:
+        print(f"[SCHEDULER] next kickoff lookup failed, polling normally: {repr(ex)}")
+        return min_sleep
+    if kickoff is None:
+        return max_sleep
+    seconds = (kickoff - datetime.now(timezone.utc)).total_seconds() - KICKOFF_LEAD_SECONDS
+    return min(max_sleep, max(min_sleep, seconds))
@@ -0,0 +1,33 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from apiCallsToCSVFiles.fetch_stats_matches import fetch_fixture_stats
+
+# Concurrent /fixtures/statistics fetch stage for the live stats producer.
+# All in-play fixtures are requested in parallel (bounded by STATS_MAX_WORKERS); rate limiting,
+# retries and keep-alive connections come from api_football_client (API_RATE_PER_MINUTE etc.),
+# so a polling cycle takes about one request latency instead of N.
+STATS_MAX_WORKERS = int(os.getenv("STATS_MAX_WORKERS", "8"))  #max requests in flight
+STATS_TIMEOUT = float(os.getenv("STATS_TIMEOUT", "10"))  #seconds per request
+
+_executor = ThreadPoolExecutor(max_workers=STATS_MAX_WORKERS, thread_name_prefix="stats")
+
+
+def fetch_stats_concurrently(fixtures: list[dict]):
+    """
+    Fetch stats for every fixture dict (fixture_id, home_team, away_team) in parallel.
+    Yields (fixture, stats) as each request completes, so publishing can start right away.
+    """
+    futures = {
+        _executor.submit(fetch_fixture_stats, f["fixture_id"], f["home_team"], f["away_team"], STATS_TIMEOUT): f
+        for f in fixtures
+    }
+    for fut in as_completed(futures):
+        f = futures[fut]
+        try:
+            yield f, fut.result()
+        except Exception as ex:
+            print(f"[{f['fixture_id']}] stats fetch failed: {repr(ex)}")
+            yield f, {}
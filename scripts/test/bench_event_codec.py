@@ -0,0 +1,78 @@
+import os, sys
+import time
+import random
+import argparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from event_codec import encode_event, decode_event, STATS_KEYS
+
+TEAMS = ["Manchester United", "Borussia Dortmund", "Paris Saint Germain", "Real Sociedad", "Wolves", "Inter"]
+LEAGUES = ["Premier League", "Bundesliga", "Ligue 1", "La Liga", "Serie A"]
+
+
+def live_event(rng: random.Random) -> dict:
+    home, away = rng.sample(TEAMS, 2)
+    e = {
+        "mode": "live",
+        "fixture_id": rng.randint(1_000_000, 1_400_000),
+        "league": rng.choice(LEAGUES),
+        "season": 2025,
+        "date": "2025-03-01T15:00:00+00:00",
+        "home_team": home,
+        "away_team": away,
+        "home_goals": rng.randint(0, 3),
+        "away_goals": rng.randint(0, 3),
+        "status_short": rng.choice(["1H", "2H"]),
+        "elapsed": rng.randint(1, 90),
+    }
+    for k in STATS_KEYS:
+        if k.endswith(("possession", "pass_accuracy")):
+            e[k] = float(rng.randint(30, 90))
+        else:
+            e[k] = float(rng.randint(0, 20))
+    return e
+
+
+def prediction_event(rng: random.Random) -> dict:
+    a, b = sorted(rng.random() for _ in range(2))
+    return {
+        "fixture_id": rng.randint(1_000_000, 1_400_000),
+        "prob_home_win": a,
+        "prob_draw": b - a,
+        "prob_away_win": 1 - b,
+        "model_version": "20250301T120000Z",
+    }
+
+
+def bench(topic: str, events: list[dict], event_format: str) -> tuple[float, float, float]:
+    t0 = time.perf_counter()
+    encoded = [encode_event(topic, e, event_format) for e in events]
+    t_enc = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    decoded = [decode_event(v) for v in encoded]
+    t_dec = time.perf_counter() - t0
+
+    assert decoded == events, f"{event_format} round trip changed the events"
+    n = len(events)
+    return sum(len(v) for v in encoded) / n, t_enc / n * 1e6, t_dec / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event_codec (binary) against JSON")
+    parser.add_argument("-n", type=int, default=100_000, help="events per topic")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for topic, make in (("match_stats_raw", live_event), ("match_predictions", prediction_event)):
+        events = [make(rng) for _ in range(args.n)]
+        print(f"\n=== {topic}: {args.n:,} events ===")
+        results = {fmt: bench(topic, events, fmt) for fmt in ("json", "binary")}
+        for fmt, (size, enc_us, dec_us) in results.items():
+            print(f"{fmt:>6}: {size:6.1f} bytes/msg  encode {enc_us:5.2f} us  decode {dec_us:5.2f} us")
+        json_size, binary_size = results["json"][0], results["binary"][0]
+        print(f"binary is {binary_size / json_size:.0%} of the JSON size")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os, sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data import features_build
+from data.features_build import build_features, ROLLING_WINDOW, MIN_MATCHES
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data_api_football")
+INPUT_CSV = os.path.join(DATA_DIR, "All_matches_2018-2025_with_stats.csv")
+
+STAT_NAMES = ["shots_total", "shots_inbox", "possession", "pass_accuracy", "corners", "fouls"]
+
+
+# Previous implementation (groupby-apply + row-wise label), kept here as the reference
+def legacy_rolling_team_averages(team_df, group_cols, stat_cols):
+    return (
+        team_df.groupby(group_cols)[stat_cols]
+        .apply(
+            lambda g: g.rolling(window=ROLLING_WINDOW, min_periods=MIN_MATCHES)
+            .mean()
+            .shift(1)
+        )
+        .reset_index(level=list(range(len(group_cols))), drop=True)
+    )
+
+
+def legacy_label_results(home_goals, away_goals):
+    def label_result(row):
+        h = row["home_goals"]
+        a = row["away_goals"]
+        if pd.isna(h) or pd.isna(a):
+            return None
+        if h > a:
+            return 2
+        elif h == a:
+            return 1
+        else:
+            return 0
+    frame = pd.DataFrame({"home_goals": home_goals, "away_goals": away_goals})
+    return frame.apply(label_result, axis=1)
+
+
+def build_features_legacy(df):
+    vectorized = (features_build.rolling_team_averages, features_build.label_results)
+    features_build.rolling_team_averages = legacy_rolling_team_averages
+    features_build.label_results = legacy_label_results
+    try:
+        return build_features(df)
+    finally:
+        features_build.rolling_team_averages, features_build.label_results = vectorized
+
+
+def synthetic_fixtures(n_fixtures: int, teams_per_league: int = 20, seed: int = 42) -> pd.DataFrame:
+    # Double round-robin seasons: teams * (teams - 1) fixtures per league-season
+    rng = np.random.default_rng(seed)
+    per_season = teams_per_league * (teams_per_league - 1)
+    n_blocks = -(-n_fixtures // per_season)
+    seasons_per_league = 20
+    n = n_blocks * per_season
+
+    block = np.repeat(np.arange(n_blocks), per_season)
+    home, away = np.array([(h, a) for h in range(teams_per_league) for a in range(teams_per_league) if h != a]).T
+    order = np.tile(np.arange(per_season), n_blocks)
+    rng.shuffle(order.reshape(n_blocks, per_season).T)
+
+    df = pd.DataFrame({
+        "league": "League " + (block // seasons_per_league).astype(str),
+        "season": 2000 + block % seasons_per_league,
+        "fixture_id": np.arange(n),
+        "date": pd.Timestamp("2000-08-01", tz="UTC") + pd.to_timedelta(order * 3600 * 12, unit="s"),
+        "home_team": "Team " + np.tile(home, n_blocks).astype(str),
+        "away_team": "Team " + np.tile(away, n_blocks).astype(str),
+        "home_goals": rng.poisson(1.5, n).astype(float),
+        "away_goals": rng.poisson(1.2, n).astype(float),
+    })
+    for side in ("home", "away"):
+        df[f"{side}_shots_total"] = rng.poisson(12, n).astype(float)
+        df[f"{side}_shots_inbox"] = rng.poisson(7, n).astype(float)
+        df[f"{side}_possession"] = rng.integers(30, 70, n).astype(float)
+        df[f"{side}_pass_accuracy"] = rng.integers(65, 92, n).astype(float)
+        df[f"{side}_corners"] = rng.poisson(5, n).astype(float)
+        df[f"{side}_fouls"] = rng.poisson(11, n).astype(float)
+    return df.iloc[:n_fixtures]
+
+
+def timed(fn, df):
+    t0 = time.perf_counter()
+    out = fn(df)
+    return out, time.perf_counter() - t0
+
+
+def run(name, df, with_legacy=True):
+    print(f"\n=== {name}: {len(df):,} fixtures ===")
+    new, t_new = timed(build_features, df)
+    print(f"vectorized: {t_new:8.2f} s  ({len(new):,} rows)")
+    if not with_legacy:
+        return
+    old, t_old = timed(build_features_legacy, df)
+    print(f"legacy:     {t_old:8.2f} s  ({len(old):,} rows)  speedup x{t_old / t_new:.1f}")
+    same = old.to_csv(index=False) == new.to_csv(index=False)
+    print("byte-identical CSV output:", same)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark features_build rolling windows")
+    parser.add_argument("--synthetic", type=int, default=1_000_000, help="synthetic fixture count (0 to skip)")
+    parser.add_argument("--skip-legacy-synthetic", action="store_true", help="only time the vectorized engine on synthetic data")
+    args = parser.parse_args()
+
+    run("All_matches_2018-2025_with_stats.csv", pd.read_csv(INPUT_CSV))
+    if args.synthetic:
+        run("synthetic", synthetic_fixtures(args.synthetic), with_legacy=not args.skip_legacy_synthetic)
+
+
+if __name__ == "__main__":
+    main()
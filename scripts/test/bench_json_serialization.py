@@ -0,0 +1,96 @@
+import os, sys
+import json
+import gzip
+import time
+import argparse
+from datetime import datetime, date
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from db_pg import fetch_matches_with_probs, insert_fixtures, db_connection
+
+# Compares the old /api/matches serialization (RealDictRow -> dict per row -> json.dumps) with
+# Postgres-built JSON (fetch_matches_with_probs(as_json=True)), plus gzip cost per level.
+#   python test/bench_json_serialization.py --seed 2000      (synthetic season, removed afterwards)
+#   python test/bench_json_serialization.py --league "Premier League" --season 2023 --limit 400
+BENCH_LEAGUE = "Bench League"
+BENCH_SEASON = 2099
+BENCH_FIXTURE_BASE = 9_900_000
+
+
+def seed(n: int) -> None:
+    rows = [
+        {
+            "fixture_id": BENCH_FIXTURE_BASE + i,
+            "league": BENCH_LEAGUE,
+            "season": BENCH_SEASON,
+            "date": f"2099-{1 + i % 12:02d}-{1 + i % 28:02d}T{12 + i % 9}:00:00+00:00",
+            "home_team": f"Home Team {i % 40}",
+            "away_team": f"Away Team {(i + 13) % 40}",
+            "home_goals": i % 4,
+            "away_goals": i % 3,
+            "status": "FT",
+        }
+        for i in range(n)
+    ]
+    insert_fixtures(rows)
+
+
+def unseed() -> None:
+    with db_connection() as conn:
+        with conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM fixtures WHERE league = %s AND season = %s;", (BENCH_LEAGUE, BENCH_SEASON))
+
+
+def old_path(league, season, limit) -> bytes:
+    # what app.py did before: jsonify(_rows_json_safe(rows))
+    rows = fetch_matches_with_probs(league, season, limit)
+    out = [{k: (v.isoformat() if isinstance(v, (datetime, date)) else v) for k, v in dict(r).items()} for r in rows]
+    return json.dumps(out).encode("utf-8")
+
+
+def new_path(league, season, limit) -> bytes:
+    return fetch_matches_with_probs(league, season, limit, as_json=True)
+
+
+def timed(fn, repeat: int):
+    fn()  # warm up (pool, plan cache)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    return body, (time.process_time() - cpu0) / repeat * 1000, (time.perf_counter() - wall0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /api/matches JSON serialization")
+    parser.add_argument("--league", default=BENCH_LEAGUE)
+    parser.add_argument("--season", type=int, default=BENCH_SEASON)
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0, help="insert N synthetic fixtures into the bench league first")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    try:
+        old_body, old_cpu, old_wall = timed(lambda: old_path(args.league, args.season, args.limit), args.repeat)
+        new_body, new_cpu, new_wall = timed(lambda: new_path(args.league, args.season, args.limit), args.repeat)
+    finally:
+        if args.seed:
+            unseed()
+
+    assert json.loads(old_body) == json.loads(new_body), "serializations differ"
+    n = len(json.loads(new_body))
+    print(f"\n=== /api/matches league={args.league!r} season={args.season}: {n} rows, {len(new_body):,} bytes ===")
+    print(f"python rows + json.dumps: {old_cpu:7.2f} ms backend CPU  {old_wall:7.2f} ms wall")
+    print(f"postgres json_agg:        {new_cpu:7.2f} ms backend CPU  {new_wall:7.2f} ms wall")
+
+    for level in (1, 5, 9):
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            gz = gzip.compress(new_body, level)
+        ms = (time.perf_counter() - t0) / args.repeat * 1000
+        print(f"gzip level {level}: {len(gz):,} bytes ({len(gz) / len(new_body):.0%})  {ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
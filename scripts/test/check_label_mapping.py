@@ -1,10 +1,13 @@
-import pandas as pd
+import os, sys
 from pathlib import Path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.storage import read_table
 
 DATA_DIR = Path(__file__).resolve().parent.parent  
 CSV_PATH = DATA_DIR / "data_api_football" / "All_matches_features.csv"
 
-df = pd.read_csv(CSV_PATH)
+df = read_table(CSV_PATH, columns=["label", "diff_goals"])
 # This file MUST contain these columns to do the check
 required = ["label", "diff_goals"]
 missing = [c for c in required if c not in df.columns]
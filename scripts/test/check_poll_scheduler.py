@@ -0,0 +1,55 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "producer")))
+
+from poll_scheduler import PollScheduler, POLL_STATS_INTERVAL, POLL_STATS_LATE_INTERVAL
+
+# Simulates the live producer loop on a fake clock and checks the live-feed sleep hint:
+#   python test/check_poll_scheduler.py
+MAX_SLEEP = 10.0  # POLL_LIVE_FIXTURES_INTERVAL of kafka_producer_live_stats
+
+
+def fixture(status, elapsed, home_goals=0, away_goals=0):
+    return {"fixture_id": 1, "status_short": status, "elapsed": elapsed,
+            "home_goals": home_goals, "away_goals": away_goals}
+
+
+def step(scheduler, f, now):
+    due = scheduler.due([f], now=now)
+    for d in due:
+        scheduler.mark_polled(d, now=now)
+    return due, scheduler.sleep_hint(MAX_SLEEP, now=now)
+
+
+s = PollScheduler()
+now = 0.0
+
+# first half: polled once, then the hint is capped at the live-feed interval
+due, hint = step(s, fixture("1H", 44), now)
+assert len(due) == 1 and hint == MAX_SLEEP, (due, hint)
+
+# half-time for longer than the stats interval: no stats polls and no 1 s live-feed polling
+for _ in range(10):
+    now += POLL_STATS_INTERVAL
+    due, hint = step(s, fixture("HT", 45), now)
+    assert not due, due
+    assert hint == MAX_SLEEP, f"1H -> HT sleep_hint={hint}, expected {MAX_SLEEP}"
+
+# play resumes: stats are fetched right away
+now += 1
+due, hint = step(s, fixture("2H", 46), now)
+assert len(due) == 1 and hint == MAX_SLEEP, (due, hint)
+
+# late in the second half: the next stats poll comes sooner than the live-feed interval allows
+now += MAX_SLEEP
+step(s, fixture("2H", 80), now)
+now += POLL_STATS_INTERVAL
+due, hint = step(s, fixture("2H", 81), now)
+assert len(due) == 1 and hint == min(MAX_SLEEP, POLL_STATS_LATE_INTERVAL), (due, hint)
+
+# a goal makes the fixture due immediately
+now += 1
+due, _ = step(s, fixture("2H", 82, home_goals=1), now)
+assert len(due) == 1, due
+
+print("poll scheduler checks OK")
@@ -0,0 +1,66 @@
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+# Closed-loop load test for the backend API: N concurrent keep-alive clients hammer one URL for a
+# fixed duration, then requests/sec and latency percentiles are printed.
+#   python test/load_test_backend.py "http://127.0.0.1:5000/api/matches?league=Premier%20League&season=2023"
+
+
+def client(url, deadline, latencies, errors, lock):
+    parts = urlsplit(url)
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    local, failed = [], 0
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                failed += 1
+                continue
+            local.append(time.perf_counter() - t0)
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        errors.append(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a backend endpoint")
+    parser.add_argument("url")
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("-d", "--duration", type=float, default=15, help="seconds")
+    args = parser.parse_args()
+
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=client, args=(args.url, deadline, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else float("nan")
+    print(f"url={args.url} concurrency={args.concurrency} duration={elapsed:.1f}s")
+    print(f"requests={len(latencies)} errors={sum(errors)} rps={len(latencies) / elapsed:.1f}")
+    print(f"latency ms: p50={pct(0.50):.1f} p95={pct(0.95):.1f} p99={pct(0.99):.1f} max={pct(1.0):.1f}")
+
+
+if __name__ == "__main__":
+    main()